@@ -0,0 +1,251 @@
+import os
+import re
+import sys
+import json
+import pickle
+from time import time, sleep
+from uuid import uuid4
+from pathlib import Path
+from threading import Lock
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set
+
+import numpy as np
+from numpy import ndarray
+
+from vnpy.trader.object import ContractData
+from vnpy.trader.utility import get_folder_path
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+
+class ContractCache:
+    """合约信息本地缓存，按交易日保存ICE代码到合约的快照"""
+
+    def __init__(self, folder_name: str = "icetcore") -> None:
+        """构造函数"""
+        self.folder_path: Path = get_folder_path(folder_name)
+
+    def get_path(self, trading_day: str) -> Path:
+        """获取交易日对应的缓存文件路径"""
+        return self.folder_path.joinpath(f"contract_{trading_day}.pkl")
+
+    def load(self, trading_day: str) -> Dict[str, ContractData]:
+        """加载交易日的合约快照，不存在或损坏时返回空字典"""
+        path: Path = self.get_path(trading_day)
+        if not path.exists():
+            return {}
+
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            return {}
+
+    def load_latest(self) -> Dict[str, ContractData]:
+        """加载最近一个交易日的合约快照，供未连接交易接口的进程使用"""
+        paths: List[Path] = sorted(self.folder_path.glob("contract_*.pkl"))
+        if not paths:
+            return {}
+        return self.load(paths[-1].stem.replace("contract_", ""))
+
+    def save(self, trading_day: str, contracts: Dict[str, ContractData]) -> None:
+        """
+        保存交易日的合约快照，并清理其他交易日的缓存
+
+        缓存目录可由多个进程共用：快照先写入唯一的临时文件再替换，替换或清理时文件正被其他进程读取则跳过。
+        """
+        path: Path = self.get_path(trading_day)
+        temp_path: Path = path.with_name(f"{path.stem}.{os.getpid()}.{uuid4().hex}.tmp")
+        try:
+            with open(temp_path, "wb") as f:
+                pickle.dump(contracts, f, protocol=pickle.HIGHEST_PROTOCOL)
+            temp_path.replace(path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
+            return
+
+        for old_path in self.folder_path.glob("contract_*.pkl"):
+            if old_path != path:
+                try:
+                    old_path.unlink()
+                except OSError:
+                    pass
+
+
+class HistoryCache:
+    """
+    历史数据本地缓存，按(ICE代码, 周期)保存为可内存映射的npy列式文件
+
+    缓存目录可由多个进程共用：每次读写前在文件锁内重新读取索引，索引和数据文件均先写入唯一的临时文件再替换。
+    """
+
+    def __init__(self, max_size: int, folder_name: str = "icetcore_history") -> None:
+        """构造函数，max_size为缓存容量上限（字节）"""
+        self.max_size: int = max_size
+        self.folder_path: Path = get_folder_path(folder_name)
+        self.index_path: Path = self.folder_path.joinpath("index.json")
+        self.lock_path: Path = self.folder_path.joinpath("index.lock")
+        self.lock: Lock = Lock()
+
+        # 索引：{文件名: {"days": 已覆盖交易日列表, "size": 文件大小, "atime": 最近访问时间}}
+        self.index: Dict[str, dict] = {}
+
+        self.hit_count: int = 0
+        self.miss_count: int = 0
+
+    @contextmanager
+    def lock_index(self) -> Iterator[None]:
+        """加进程内锁和文件锁，并重新读取其他进程可能已修改的索引"""
+        with self.lock, open(self.lock_path, "a+b") as f:
+            lock_file(f)
+            try:
+                self.index = self.read_index()
+                yield
+            finally:
+                unlock_file(f)
+
+    def read_index(self) -> Dict[str, dict]:
+        """读取索引，不存在或损坏时返回空字典"""
+        if not self.index_path.exists():
+            return {}
+
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def get_temp_path(self, path: Path) -> Path:
+        """获取进程间不会冲突的临时文件路径"""
+        return path.with_name(f"{path.stem}.{os.getpid()}.{uuid4().hex}.tmp{path.suffix}")
+
+    def get_name(self, ice_symbol: str, interval: int) -> str:
+        """获取缓存文件名"""
+        return re.sub(r"[^\w.-]", "_", f"{ice_symbol}_{interval}") + ".npy"
+
+    def get_missing_days(self, ice_symbol: str, interval: int, days: List[str]) -> List[str]:
+        """返回尚未缓存的交易日，并统计命中情况"""
+        with self.lock_index():
+            name: str = self.get_name(ice_symbol, interval)
+            covered: Set[str] = set()
+            if self.folder_path.joinpath(name).exists():
+                covered = set(self.index.get(name, {}).get("days", []))
+
+            missing: List[str] = [day for day in days if day not in covered]
+            self.hit_count += len(days) - len(missing)
+            self.miss_count += len(missing)
+            return missing
+
+    def load(self, ice_symbol: str, interval: int, start: int, end: int) -> Optional[ndarray]:
+        """读取时间戳在[start, end]范围内的数据，返回内存中的副本，缓存文件已被淘汰时返回None"""
+        with self.lock_index():
+            name: str = self.get_name(ice_symbol, interval)
+            path: Path = self.folder_path.joinpath(name)
+            if name not in self.index or not path.exists():
+                if self.index.pop(name, None):
+                    self.save_index()
+                return None
+
+            array: ndarray = np.load(path, mmap_mode="r")
+            left: int = np.searchsorted(array["datetime"], start, side="left")
+            right: int = np.searchsorted(array["datetime"], end, side="right")
+            data: ndarray = np.array(array[left:right])
+            del array
+
+            self.index[name]["atime"] = time()
+            self.save_index()
+            return data
+
+    def update(self, ice_symbol: str, interval: int, days: List[str], data: ndarray) -> None:
+        """合并新下载的数据（同一时间戳以新数据为准），并标记已完整覆盖的交易日"""
+        with self.lock_index():
+            name: str = self.get_name(ice_symbol, interval)
+            path: Path = self.folder_path.joinpath(name)
+
+            if path.exists():
+                if name in self.index:
+                    data = np.concatenate([data, np.load(path)])
+            else:
+                self.index.pop(name, None)
+
+            # 稳定排序后取每个时间戳的首条，同一时间戳以新数据为准
+            data = data[np.argsort(data["datetime"], kind="stable")]
+            _, unique_index = np.unique(data["datetime"], return_index=True)
+            data = data[unique_index]
+
+            temp_path: Path = self.get_temp_path(path)
+            np.save(temp_path, data)
+            temp_path.replace(path)
+
+            info: dict = self.index.setdefault(name, {"days": []})
+            info["days"] = sorted(set(info["days"]) | set(days))
+            info["size"] = path.stat().st_size
+            info["atime"] = time()
+
+            self.evict(name)
+            self.save_index()
+
+    def evict(self, keep: str) -> None:
+        """超出容量上限时，按最近访问时间淘汰缓存文件"""
+        total: int = sum(info.get("size", 0) for info in self.index.values())
+        for name in sorted(self.index, key=lambda n: self.index[n].get("atime", 0)):
+            if total <= self.max_size:
+                break
+            if name == keep:
+                continue
+
+            total -= self.index[name].get("size", 0)
+            self.index.pop(name)
+            path: Path = self.folder_path.joinpath(name)
+            if path.exists():
+                path.unlink()
+
+    def save_index(self) -> None:
+        """保存缓存索引，需在lock_index内调用"""
+        temp_path: Path = self.get_temp_path(self.index_path)
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        temp_path.replace(self.index_path)
+
+    def count_miss(self, days: int) -> None:
+        """将已计为命中、但读取时缓存文件已失效的交易日改计为未命中"""
+        with self.lock:
+            self.hit_count -= days
+            self.miss_count += days
+
+    def get_statistics(self) -> Dict[str, int]:
+        """查询缓存统计，命中和未命中以交易日计"""
+        with self.lock_index():
+            return {
+                "hit": self.hit_count,
+                "miss": self.miss_count,
+                "files": len(self.index),
+                "size": sum(info.get("size", 0) for info in self.index.values())
+            }
+
+
+def lock_file(f) -> None:
+    """阻塞获取文件独占锁"""
+    if sys.platform == "win32":
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                sleep(0.01)
+    else:
+        fcntl.flock(f, fcntl.LOCK_EX)
+
+
+def unlock_file(f) -> None:
+    """释放文件锁"""
+    if sys.platform == "win32":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f, fcntl.LOCK_UN)
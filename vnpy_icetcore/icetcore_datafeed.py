@@ -1,16 +1,29 @@
-from datetime import datetime, timedelta
-from typing import Dict, List,  Optional, Callable
-
+import gc
+import sys
+from datetime import datetime, timedelta, date
+from time import perf_counter
+from queue import Queue
+from threading import Thread, Lock, Event
+from itertools import chain
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from typing import Dict, List,  Optional, Callable, Tuple, Iterator
+
+import numpy as np
 from numpy import ndarray
+from pandas import DataFrame, DatetimeIndex
 from icetcore import TCoreAPI
 
 from vnpy.trader.setting import SETTINGS
-from vnpy.trader.constant import Exchange, Interval,Product
+from vnpy.trader.constant import Exchange, Interval
 from vnpy.trader.object import BarData, TickData, HistoryRequest,ContractData
 from vnpy.trader.utility import ZoneInfo
 from vnpy.trader.datafeed import BaseDatafeed
 
-from .icetcore_gateway import symbol_contract_map,EXCHANGE_VT2ICE,EXCHANGE_ICE2VT
+from .icetcore_gateway import symbol_contract_map,EXCHANGE_VT2ICE,EXCHANGE_ICE2VT,ContractResolver
+from .icetcore_product import get_symbol_head
+from .icetcore_cache import HistoryCache
+from .icetcore_session import session_manager
 
 INTERVAL_VT2ICE: Dict[Interval, int] = {
     Interval.TICK: 2,
@@ -24,7 +37,46 @@ INTERVAL_ADJUSTMENT_MAP: Dict[Interval, timedelta] = {
     Interval.DAILY: timedelta()         # no need to adjust for daily bar
 }
 
-
+# K线列式数据格式，时间戳为UTC纳秒
+BAR_DTYPE: np.dtype = np.dtype([
+    ("datetime", "i8"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+    ("open_interest", "f8")
+])
+
+# Tick列式数据格式，时间戳为UTC纳秒
+TICK_DTYPE: np.dtype = np.dtype([
+    ("datetime", "i8"),
+    ("last_price", "f8"),
+    ("volume", "f8"),
+    ("open_interest", "f8"),
+    ("bid_price_1", "f8"),
+    ("ask_price_1", "f8"),
+    ("bid_volume_1", "f8"),
+    ("ask_volume_1", "f8")
+])
+
+# getquotehistory返回的Tick字段，依次对应TICK_DTYPE各列
+TICK_ROW_FIELDS: Tuple[str, ...] = (
+    "DateTime",
+    "Last",
+    "Quantity",
+    "OpenInterest",
+    "Bid",
+    "Ask",
+    "BidVolume",
+    "AskVolume"
+)
+TICK_ROW_DTYPE: np.dtype = np.dtype([("datetime", "O")] + TICK_DTYPE.descr[1:])
+tick_row_getter: Callable = itemgetter(*TICK_ROW_FIELDS)
+
+MAX_FLOAT: float = sys.float_info.max
+
+CHINA_OFFSET: int = 8 * 3600 * 1_000_000_000        # 北京时间与UTC相差的纳秒数
 
 CHINA_TZ = ZoneInfo("Asia/Shanghai")
 
@@ -38,17 +90,47 @@ class IceTCoreDatafeed(BaseDatafeed):
         self.username: str = SETTINGS["datafeed.apppath"]
         self.api: "TCoreAPI" =None
         self.inited: bool = False
+
+        # 进行中的历史数据请求数，为0时才可切换连接
+        self.request_lock: Lock = Lock()
+        self.request_count: int = 0
         self.symbols: ndarray = None
 
+        # 未连接交易接口时，通过自己的解析器按需加载合约
+        self.resolver: ContractResolver = ContractResolver("ICETCore")
+
+        # 分段下载设置：并发线程数、每个窗口包含的天数
+        self.max_workers: int = int(SETTINGS.get("datafeed.workers", 4))
+        self.window_days: int = int(SETTINGS.get("datafeed.window_days", 1))
+        self.window_stats: List[Tuple[str, str, int, float]] = []
+        self.merge_stats: dict = {}
+
+        # 分钟K线本地缓存，容量上限单位为MB，设为0时关闭
+        cache_size: int = int(SETTINGS.get("datafeed.cache_size", 1024))
+        self.history_cache: HistoryCache = None
+        if cache_size > 0:
+            self.history_cache = HistoryCache(cache_size * 1024 * 1024)
+
+        # 后台预取的分钟K线，内存中最多保留的合约数
+        self.prefetcher: HistoryPrefetcher = HistoryPrefetcher(self, int(SETTINGS.get("datafeed.prefetch_size", 100)))
+
     def init(self, output: Callable = print) -> bool:
         """初始化"""
         if self.inited:
             return True
-        self.api=TCoreAPI(apppath=self.username)
-        self.api.connect()
+        # 与交易接口共用同一客户端连接
+        self.api = session_manager.acquire(self.username)
+        self.resolver.api = self.api
         self.inited = True
         return True
 
+    def close(self) -> None:
+        """释放客户端连接"""
+        if self.inited:
+            session_manager.release(self.api)
+            self.api = None
+            self.resolver.api = None
+            self.inited = False
 
     def write_error(self, msg: str, error: dict) -> None:
         """输出错误信息日志"""
@@ -58,160 +140,751 @@ class IceTCoreDatafeed(BaseDatafeed):
         self.write_log(msg)
 
     def query_bar_history(self, req: HistoryRequest, output: Callable = print) -> Optional[List[BarData]]:
+        """查询K线数据"""
+        array: ndarray = self.query_bar_array(req, output)
+        if array is None:
+            return []
+        return bar_array_to_bars(array, req.symbol, req.exchange, req.interval)
+
+    def query_bar_dataframe(self, req: HistoryRequest, output: Callable = print) -> Optional[DataFrame]:
+        """查询K线数据，返回DataFrame（datetime列为UTC纳秒时间戳）"""
+        array: ndarray = self.query_bar_array(req, output)
+        if array is None:
+            return None
+        return DataFrame(array)
+
+    def query_bar_array(self, req: HistoryRequest, output: Callable = print) -> Optional[ndarray]:
+        """查询K线数据，返回BAR_DTYPE格式的列式数据，不创建BarData对象"""
+        array: ndarray = self.prefetcher.get(req, output)
+        if array is not None:
+            return array
+        return self.load_bar_array(req, output)
+
+    def load_bar_array(self, req: HistoryRequest, output: Callable = print) -> Optional[ndarray]:
+        """下载K线数据（日内K线优先读取本地缓存），不经过内存预取结果"""
+        ice_symbol, rq_interval = self.resolve_request(req, output)
+        if not ice_symbol:
+            return None
+
+        windows, missing_days = self.plan_bar_windows(req, rq_interval, ice_symbol)
+        results: List[list] = self.fetch_windows(rq_interval, ice_symbol, windows, output)
+        data: ndarray = self.merge_windows(ice_symbol, windows, results, rows_to_bar_array, True, output)
+        return self.finish_bar_array(req, rq_interval, ice_symbol, missing_days, data, output)
+
+    def query_bar_history_batch(
+        self,
+        reqs: List[HistoryRequest],
+        output: Callable = print
+    ) -> Dict[str, List[BarData]]:
+        """批量查询多个合约的K线数据，返回{vt_symbol: BarData列表}"""
+        return {req.vt_symbol: bars for req, bars in self.iter_bar_history_batch(reqs, output)}
+
+    def iter_bar_history_batch(
+        self,
+        reqs: List[HistoryRequest],
+        output: Callable = print
+    ) -> Iterator[Tuple[HistoryRequest, List[BarData]]]:
+        """
+        批量查询多个合约的K线数据，按合约完成顺序逐个返回(请求, BarData列表)。
+
+        所有合约的下载窗口共用一个线程池，总并发数不超过datafeed.workers。
+        """
+        if not self.init(output):
+            return
+
+        start: float = perf_counter()
+        tasks: List[list] = []          # [请求, ICE周期, ICE代码, 缺失交易日, 各窗口数据, 剩余窗口数, 窗口列表]
+        window_count: int = 0
+        for req in reqs:
+            ice_symbol, rq_interval = self.resolve_request(req, output)
+            if not ice_symbol:
+                yield req, []
+                continue
+
+            windows, missing_days = self.plan_bar_windows(req, rq_interval, ice_symbol)
+            tasks.append([req, rq_interval, ice_symbol, missing_days, [None] * len(windows), len(windows), windows])
+            window_count += len(windows)
+
+        finished_count: int = 0
+        window_done: int = 0
+        row_count: int = 0
+
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures: Dict[Future, Tuple[list, int]] = {}
+            for task in tasks:
+                for i, window in enumerate(task[6]):
+                    future: Future = executor.submit(self.fetch_window, task[1], task[2], window)
+                    futures[future] = (task, i)
+
+            # 已全部缓存的合约无需下载，直接返回
+            ready: List[list] = [task for task in tasks if not task[5]]
+
+            for future in chain([None], as_completed(futures)):
+                if future:
+                    task, i = futures.pop(future)
+                    his, _ = future.result()
+                    task[4][i] = his
+                    task[5] -= 1
+                    window_done += 1
+                    row_count += len(his)
+                    if not task[5]:
+                        ready.append(task)
+
+                for task in ready:
+                    req, rq_interval, ice_symbol, missing_days, results, _, windows = task
+                    data: ndarray = self.merge_windows(ice_symbol, windows, results, rows_to_bar_array, True, output)
+                    task[4] = None
+                    array: ndarray = self.finish_bar_array(req, rq_interval, ice_symbol, missing_days, data, output)
+
+                    finished_count += 1
+                    cost: float = perf_counter() - start
+                    output(
+                        f"批量下载进度{finished_count}/{len(tasks)}个合约，"
+                        f"{window_done}/{window_count}个窗口，共{row_count}条，"
+                        f"耗时{cost:.2f}秒（{row_count / max(cost, 1e-6):.0f}条/秒）"
+                    )
+                    yield req, bar_array_to_bars(array, req.symbol, req.exchange, req.interval)
+                ready = []
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def plan_bar_windows(
+        self,
+        req: HistoryRequest,
+        rq_interval: int,
+        ice_symbol: str
+    ) -> Tuple[List[Tuple[str, str]], List[date]]:
+        """计算需要下载的时间窗口，以及其中本地缓存缺失的交易日"""
+        start: date = req.start.date()
+        end: date = req.end.date()
+
+        # 日K线整段下载，不使用本地缓存
+        if rq_interval >= 5:
+            windows: List[Tuple[str, str]] = [(
+                start.strftime('%Y%m%d')+"01",
+                (req.end+timedelta(days=2)).date().strftime('%Y%m%d')+"08"
+            )]
+            return windows, []
+
+        days: List[date] = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        if not self.history_cache:
+            return get_bar_windows(start, end, self.window_days), days
+
+        day_strs: List[str] = [day.strftime("%Y%m%d") for day in days]
+        missing: List[str] = self.history_cache.get_missing_days(ice_symbol, rq_interval, day_strs)
+
+        # 连续的缺失交易日合并后切分下载窗口
+        windows: List[Tuple[str, str]] = []
+        missing_days: List[date] = [datetime.strptime(day, "%Y%m%d").date() for day in missing]
+        if missing_days:
+            run_start: date = missing_days[0]
+            for prev, day in zip(missing_days, missing_days[1:] + [None]):
+                if day is None or day - prev > timedelta(days=1):
+                    windows.extend(get_bar_windows(run_start, prev, self.window_days))
+                    run_start = day
+        return windows, missing_days
+
+    def finish_bar_array(
+        self,
+        req: HistoryRequest,
+        rq_interval: int,
+        ice_symbol: str,
+        missing_days: List[date],
+        data: ndarray,
+        output: Callable = print
+    ) -> ndarray:
+        """将下载数据写入本地缓存并读取完整区间，最后将K线时间戳调整为开始时间"""
+        if rq_interval < 5 and self.history_cache:
+            start: date = req.start.date()
+            end: date = req.end.date()
+
+            # 只有窗口已结束（次日08时之后）的交易日才标记为完整缓存
+            if missing_days:
+                now: datetime = datetime.now()
+                complete: List[str] = [
+                    day.strftime("%Y%m%d") for day in missing_days
+                    if datetime.combine(day + timedelta(days=1), datetime.min.time()) + timedelta(hours=8) <= now
+                ]
+                self.history_cache.update(ice_symbol, rq_interval, complete, data)
+
+            statistics: dict = self.history_cache.get_statistics()
+            output(
+                f"{ice_symbol}本地缓存命中{(end - start).days + 1 - len(missing_days)}天，下载{len(missing_days)}天"
+                f"（累计命中{statistics['hit']}天，未命中{statistics['miss']}天）"
+            )
+
+            range_start: int = to_timestamp(datetime.combine(start, datetime.min.time()) + timedelta(hours=1))
+            range_end: int = to_timestamp(datetime.combine(end + timedelta(days=1), datetime.min.time()) + timedelta(hours=8))
+            cached: ndarray = self.history_cache.load(ice_symbol, rq_interval, range_start, range_end)
+            if cached is not None:
+                data = cached
+            elif len(missing_days) < (end - start).days + 1:
+                # 缓存文件已被其他进程淘汰，命中的交易日改计为未命中，重新下载完整区间
+                self.history_cache.count_miss((end - start).days + 1 - len(missing_days))
+                output(f"{ice_symbol}本地缓存文件已失效，重新下载")
+                windows: List[Tuple[str, str]] = get_bar_windows(start, end, self.window_days)
+                results: List[list] = self.fetch_windows(rq_interval, ice_symbol, windows, output)
+                data = self.merge_windows(ice_symbol, windows, results, rows_to_bar_array, True, output)
+
+        # K线时间戳调整为开始时间
+        adjustment: timedelta = INTERVAL_ADJUSTMENT_MAP[req.interval]
+        data["datetime"] -= int(adjustment.total_seconds()) * 1_000_000_000
+        return data
+
+    def resolve_request(self, req: HistoryRequest, output: Callable = print) -> Tuple[str, int]:
+        """检查历史数据请求，返回ICE代码和ICE周期，不支持时返回空值"""
         if not self.inited:
             n: bool = self.init(output)
             if not n:
-                return []
+                return None, None
+        self.reacquire_session()
 
-        symbol: str = req.symbol
-        exchange: Exchange = req.exchange
-        interval: Interval = req.interval
-        start: datetime = req.start
-        end: datetime = req.end
-        # start: str = req.start.strftime('%Y%m%d%H')
-        # end: str = req.end.strftime('%Y%m%d%H')
+        key: str = EXCHANGE_VT2ICE[req.exchange]+"."+req.symbol
+        contract: ContractData = symbol_contract_map.get(key, None)
+        if not contract:
+            _, contract = self.resolver.resolve(key)
 
-        contract: ContractData = symbol_contract_map.get(EXCHANGE_VT2ICE[req.exchange]+"."+req.symbol, None)
         # 检查查询的代码在范围内
         if not contract:
             output(f"查询K线数据失败：不支持的合约代码{req.vt_symbol}")
-            return []
+            return None, None
 
-        rq_interval: int = INTERVAL_VT2ICE.get(interval)
+        rq_interval: int = INTERVAL_VT2ICE.get(req.interval)
         if not rq_interval:
             output(f"查询K线数据失败：不支持的时间周期{req.interval.value}")
-            return []
-        #print(symbol,"  ",exchange,"  ",interval,"  ",start,"  ",end,"  ",contract.name)
-        symbolhead="TC.S."
-        if contract.product==Product.FUTURES:
-            symbolhead="TC.F."
-        elif contract.product==Product.OPTION:
-            symbolhead="TC.O." 
-
-        adjustment: timedelta = INTERVAL_ADJUSTMENT_MAP[interval]
-
-        # 只对衍生品合约才查询持仓量数据
-        fields: list = ["open", "high", "low", "close", "volume"]
-        if symbolhead=="TC.F." or symbolhead=="TC.O.":
-            fields.append("open_interest")
-
-        stime=start.date()
-        df=[]
-        if rq_interval<5:
-            while(True):
-                if stime<end.date()+timedelta(days=1):
-                    his=self.api.getquotehistory(rq_interval,1,symbolhead+contract.name,stime.strftime('%Y%m%d')+"01",(stime+timedelta(days=1)).strftime('%Y%m%d')+"08")
-                    if his:
-                        df=df+his
-                    stime=stime+timedelta(days=1)
-                else:
-                    break
-        else:
-            df=self.api.getquotehistory(rq_interval,1,symbolhead+contract.name,stime.strftime('%Y%m%d')+"01",(end+timedelta(days=2)).date().strftime('%Y%m%d')+"08")
-        data: List[BarData] = []
-        if df:
-            for row in df:
-                dt: datetime = (row["DateTime"]- adjustment).replace(tzinfo=CHINA_TZ)
-                bar: BarData = BarData(
-                    symbol=symbol,
-                    exchange=exchange,
-                    interval=interval,
-                    datetime=dt,
-                    open_price=row["Open"],
-                    high_price=row["High"],
-                    low_price=row["Low"],
-                    close_price=row["Close"],
-                    volume=row["Volume"],
-                    open_interest=row["OpenInterest"],
-                    gateway_name="ICETCore"
-                )
-                data.append(bar)
+            return None, None
+
+        symbolhead: str = get_symbol_head(contract.product)
+        return symbolhead+contract.name, rq_interval
+
+    def fetch_window(self, rq_interval: int, ice_symbol: str, window: Tuple[str, str]) -> Tuple[list, float]:
+        """下载单个时间窗口的历史数据，返回数据和耗时"""
+        start: float = perf_counter()
+        with self.request_lock:
+            api: TCoreAPI = self.api
+            self.request_count += 1
+
+        try:
+            with session_manager.request(api):
+                his: list = api.getquotehistory(rq_interval, 1, ice_symbol, window[0], window[1])
+        finally:
+            with self.request_lock:
+                self.request_count -= 1
+        return his or [], perf_counter() - start
+
+    def reacquire_session(self) -> None:
+        """交易接口在数据服务初始化之后连接时，空闲时改用交易接口的连接，释放单独建立的连接"""
+        with self.request_lock:
+            if self.request_count or not self.api:
+                return
+
+            # 持有解析器的锁，确保原连接上没有进行中的合约查询
+            with self.resolver.lock:
+                api: TCoreAPI = session_manager.reacquire(self.api)
+                self.api = api
+                self.resolver.api = api
+
+    def fetch_windows(
+        self,
+        rq_interval: int,
+        ice_symbol: str,
+        windows: List[Tuple[str, str]],
+        output: Callable = print
+    ) -> List[list]:
+        """通过线程池并发下载各时间窗口，按窗口顺序返回各窗口数据"""
+        start: float = perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results: List[Tuple[list, float]] = list(executor.map(
+                lambda window: self.fetch_window(rq_interval, ice_symbol, window),
+                windows
+            ))
+        cost: float = perf_counter() - start
+
+        self.window_stats = [
+            (window[0], window[1], len(his), latency)
+            for window, (his, latency) in zip(windows, results)
+        ]
+
+        if results:
+            row_count: int = sum(len(his) for his, _ in results)
+            latencies: List[float] = [latency for _, latency in results]
+            output(
+                f"{ice_symbol}历史数据下载完成，{len(windows)}个窗口共{row_count}条，"
+                f"耗时{cost:.2f}秒（{row_count / max(cost, 1e-6):.0f}条/秒），"
+                f"窗口延时平均{sum(latencies) / len(latencies) * 1000:.0f}毫秒，最大{max(latencies) * 1000:.0f}毫秒"
+            )
+        return [his for his, _ in results]
+
+    def merge_windows(
+        self,
+        ice_symbol: str,
+        windows: List[Tuple[str, str]],
+        results: List[list],
+        convert: Callable[[list], ndarray],
+        unique_time: bool,
+        output: Callable = print
+    ) -> ndarray:
+        """转换各窗口数据并按时间线性合并，输出边界去重条数和无数据窗口"""
+        arrays: List[ndarray] = [convert(his) for his in results]
+        if not arrays:
+            return convert([])
+
+        data, duplicates = merge_window_arrays(arrays, unique_time)
+        gaps: List[Tuple[str, str]] = [window for window, array in zip(windows, arrays) if not len(array)]
+        self.merge_stats = {"rows": len(data), "duplicates": duplicates, "gaps": gaps}
+
+        if duplicates or gaps:
+            msg: str = f"{ice_symbol}合并{len(windows)}个窗口共{len(data)}条，去除边界重复{duplicates}条"
+            if gaps:
+                msg += f"，无数据窗口{len(gaps)}个：" + "、".join(f"{window[0]}-{window[1]}" for window in gaps)
+            output(msg)
         return data
 
-    def query_tick_history(self, req: HistoryRequest, output: Callable = print) -> Optional[List[TickData]]:
-        """查询Tick数据"""
-        if not self.inited:
-            n: bool = self.init(output)
-            if not n:
-                return []
+    def query_tick_dataframe(self, req: HistoryRequest, output: Callable = print) -> Optional[DataFrame]:
+        """查询Tick数据，返回DataFrame（datetime列为UTC纳秒时间戳）"""
+        array: ndarray = self.query_tick_array(req, output)
+        if array is None:
+            return None
+        return DataFrame(array)
 
-        symbol: str = req.symbol
-        exchange: Exchange = req.exchange
-        interval: Interval = req.interval
-        start: datetime = req.start
-        end: datetime = req.end
-        # start: str = req.start.strftime('%Y%m%d%H')
-        # end: str = req.end.strftime('%Y%m%d%H')
+    def query_tick_array(self, req: HistoryRequest, output: Callable = print) -> Optional[ndarray]:
+        """查询Tick数据，返回TICK_DTYPE格式的列式数据，不创建TickData对象"""
+        ice_symbol, rq_interval = self.resolve_request(req, output)
+        if not ice_symbol:
+            return None
 
-        contract: ContractData = symbol_contract_map.get(EXCHANGE_VT2ICE[req.exchange]+"."+req.symbol, None)
-        # 检查查询的代码在范围内
-        if not contract:
-            output(f"查询K线数据失败：不支持的合约代码{req.vt_symbol}")
-            return []
+        windows: List[Tuple[str, str]] = get_tick_windows(req.start.date(), req.end.date())
+        results: List[list] = self.fetch_windows(rq_interval, ice_symbol, windows, output)
+        return self.merge_windows(ice_symbol, windows, results, rows_to_tick_array, False, output)
 
-        rq_interval: int = INTERVAL_VT2ICE.get(interval)
-        if not rq_interval:
-            output(f"查询K线数据失败：不支持的时间周期{req.interval.value}")
-            return []
-        #print(symbol,"  ",exchange,"  ",interval,"  ",start,"  ",end,"  ",contract.name)
-        symbolhead="TC.S."
-        if contract.product==Product.FUTURES:
-            symbolhead="TC.F."
-        elif contract.product==Product.OPTION:
-            symbolhead="TC.O." 
-
-        adjustment: timedelta = INTERVAL_ADJUSTMENT_MAP[interval]
-
-        # 只对衍生品合约才查询持仓量数据
-
-        fields: list = [
-            "open",
-            "high",
-            "low",
-            "last",
-            "volume",
-            "b1",
-            "a1",
-            "b1_v",
-            "a1_v"]
-        if symbolhead=="TC.F." or symbolhead=="TC.O.":
-            fields.append("open_interest")
-
-        stime=start.date()
-        df=[]
-        while(True):
-            if stime<end.date():
-                print()
-                his=self.api.getquotehistory(rq_interval,1,symbolhead+contract.name,stime.strftime('%Y%m%d')+"10",(stime+timedelta(days=1)).strftime('%Y%m%d')+"10")
-                if his:
-                    df=df+his
-                stime=stime+timedelta(days=1)
-            else:
-                break
-        #df=self.api.getquotehistory(rq_interval,1,symbolhead+contract.name,start,end)
-        data: List[TickData] = []
-        if df:
-            for row in df:
-                dt: datetime = row["DateTime"].replace(tzinfo=CHINA_TZ)
-
-                tick: TickData = TickData(
-                    symbol=symbol,
-                    exchange=exchange,
-                    datetime=dt,
-                    open_price=row["Last"],
-                    high_price=row["Last"],
-                    low_price=row["Last"],
-                    last_price=row["Last"],
-                    volume=row["Quantity"],
-                    open_interest=row["OpenInterest"],
-                    bid_price_1=row["Bid"],
-                    ask_price_1=row["Ask"],
-                    bid_volume_1=row["OpenInterest"],
-                    ask_volume_1=row["OpenInterest"],
-
-                    gateway_name="ICETCore"
-                )
-
-                data.append(tick)
+    def query_tick_history(self, req: HistoryRequest, output: Callable = print) -> Optional[List[TickData]]:
+        """查询Tick数据"""
+        return list(chain.from_iterable(self.stream_tick_history(req, output)))
+
+    def stream_tick_history(self, req: HistoryRequest, output: Callable = print) -> Iterator[List[TickData]]:
+        """
+        按时间窗口流式查询Tick数据，每次返回一个窗口的TickData列表。
+
+        下一个窗口在后台下载，内存中最多同时保留两个窗口的数据。
+        """
+        ice_symbol, rq_interval = self.resolve_request(req, output)
+        if not ice_symbol:
+            return
+
+        windows: List[Tuple[str, str]] = get_tick_windows(req.start.date(), req.end.date())
+        if not windows:
+            return
+
+        # 只保留上一窗口的数据用于边界去重
+        prev: ndarray = rows_to_tick_array([])
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future: Future = executor.submit(self.fetch_window, rq_interval, ice_symbol, windows[0])
+
+            for i in range(len(windows)):
+                his, _ = future.result()
+                if i + 1 < len(windows):
+                    future = executor.submit(self.fetch_window, rq_interval, ice_symbol, windows[i + 1])
+
+                array: ndarray = drop_boundary_duplicates(prev, rows_to_tick_array(his), False)
+                del his
+                if len(array):
+                    prev = array
+                    yield tick_array_to_ticks(array, req.symbol, req.exchange)
+
+
+class PrefetchEntry:
+    """预取的K线数据"""
+
+    def __init__(self, req: HistoryRequest) -> None:
+        """构造函数"""
+        self.start: date = req.start.date()
+        self.event: Event = Event()
+        self.array: ndarray = None
+        self.fetched_at: datetime = None
+        self.refreshing: bool = False
+        self.running: bool = False
+
+
+class HistoryPrefetcher:
+    """
+    分钟K线后台预取
+
+    预取任务在单个后台线程中按顺序执行，结果按(vt_symbol, 周期)保存在内存中。
+    之后起始日期不早于预取范围的查询直接返回内存数据：请求结束时间晚于预取时间不超过datafeed.prefetch_tolerance秒时
+    立即返回并在后台补充尾部，超过时同步补充下载尾部窗口，此时不计为命中。
+    """
+
+    def __init__(self, datafeed: "IceTCoreDatafeed", max_size: int) -> None:
+        """构造函数"""
+        self.datafeed: IceTCoreDatafeed = datafeed
+        self.max_size: int = max_size
+        self.timeout: float = float(SETTINGS.get("datafeed.prefetch_timeout", 60))
+        self.tolerance: float = float(SETTINGS.get("datafeed.prefetch_tolerance", 60))
+
+        self.lock: Lock = Lock()
+        self.queue: Queue = Queue()
+        self.thread: Thread = None
+        self.entries: Dict[Tuple[str, Interval], PrefetchEntry] = {}
+
+        self.hit_count: int = 0
+        self.miss_count: int = 0
+        self.refresh_count: int = 0
+
+    def put(self, req: HistoryRequest) -> None:
+        """添加预取任务，已预取且覆盖请求起始日期的合约不重复下载"""
+        if req.interval != Interval.MINUTE or self.max_size <= 0:
+            return
+
+        key: Tuple[str, Interval] = (req.vt_symbol, req.interval)
+        with self.lock:
+            entry: PrefetchEntry = self.entries.get(key, None)
+            if entry and entry.start <= req.start.date():
+                return
+
+            self.entries.pop(key, None)
+            self.entries[key] = PrefetchEntry(req)
+            while len(self.entries) > self.max_size:
+                self.entries.pop(next(iter(self.entries)))
+
+            self.start_thread()
+
+        self.queue.put((key, req, False))
+
+    def start_thread(self) -> None:
+        """启动后台线程，需在加锁后调用"""
+        if not self.thread:
+            self.thread = Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    def run(self) -> None:
+        """后台线程执行预取和尾部补充任务"""
+        while True:
+            key, req, refresh = self.queue.get()
+            entry: PrefetchEntry = self.entries.get(key, None)
+            if not entry:
+                continue
+
+            if refresh:
+                try:
+                    self.refresh(entry, req, lambda msg: None)
+                except Exception:
+                    pass
+                finally:
+                    entry.refreshing = False
+                continue
+
+            entry.running = True
+            try:
+                fetched_at: datetime = datetime.now()
+                entry.array = self.datafeed.load_bar_array(req, lambda msg: None)
+                entry.fetched_at = fetched_at
+            except Exception:
+                entry.array = None
+            finally:
+                entry.event.set()
+
+    def get(self, req: HistoryRequest, output: Callable = print) -> Optional[ndarray]:
+        """
+        读取覆盖请求范围的预取数据
+
+        预取正在下载时最多等待datafeed.prefetch_timeout秒，仍在队列中排队时不等待，由调用方直接下载。
+        """
+        if req.interval != Interval.MINUTE:
+            return None
+
+        key: Tuple[str, Interval] = (req.vt_symbol, req.interval)
+        entry: PrefetchEntry = self.entries.get(key, None)
+        if (
+            not entry
+            or entry.start > req.start.date()
+            or not (entry.event.is_set() or (entry.running and entry.event.wait(self.timeout)))
+            or entry.array is None
+        ):
+            self.miss_count += 1
+            return None
+
+        adjustment: int = int(INTERVAL_ADJUSTMENT_MAP[req.interval].total_seconds()) * 1_000_000_000
+
+        # 预取之后新产生的数据：差距较小时先返回内存数据并在后台补充，否则同步补充下载
+        gap: float = (to_timestamp(req.end) - to_timestamp(entry.fetched_at)) / 1_000_000_000
+        if gap > self.tolerance:
+            if not self.refresh(entry, req, output):
+                self.miss_count += 1
+                return None
+            self.refresh_count += 1
+        else:
+            if gap > 0:
+                with self.lock:
+                    if not entry.refreshing:
+                        entry.refreshing = True
+                        self.start_thread()
+                        self.queue.put((key, req, True))
+            self.hit_count += 1
+
+        # 与直接查询相同的时间范围：首日01时至末日次日08时
+        array: ndarray = entry.array
+        range_start: int = to_timestamp(datetime.combine(req.start.date(), datetime.min.time()) + timedelta(hours=1)) - adjustment
+        range_end: int = to_timestamp(datetime.combine(req.end.date() + timedelta(days=1), datetime.min.time()) + timedelta(hours=8)) - adjustment
+        left: int = np.searchsorted(array["datetime"], range_start, side="left")
+        right: int = np.searchsorted(array["datetime"], range_end, side="right")
+        return np.array(array[left:right])
+
+    def refresh(self, entry: PrefetchEntry, req: HistoryRequest, output: Callable) -> bool:
+        """补充下载预取之后新产生的数据，从预取当日的窗口开始，下载失败时返回False"""
+        fetched_at: datetime = datetime.now()
+        tail_req: HistoryRequest = HistoryRequest(
+            symbol=req.symbol,
+            exchange=req.exchange,
+            start=entry.fetched_at,
+            end=req.end,
+            interval=req.interval
+        )
+        tail: ndarray = self.datafeed.load_bar_array(tail_req, output)
+        if tail is None:
+            return False
+
+        adjustment: int = int(INTERVAL_ADJUSTMENT_MAP[req.interval].total_seconds()) * 1_000_000_000
+        cut: int = to_timestamp(datetime.combine(entry.fetched_at.date(), datetime.min.time()) + timedelta(hours=1)) - adjustment
+        with self.lock:
+            entry.array = np.concatenate([
+                entry.array[entry.array["datetime"] < cut],
+                tail[tail["datetime"] >= cut]
+            ])
+            entry.fetched_at = fetched_at
+        return True
 
-        return data
+    def get_statistics(self) -> Dict[str, float]:
+        """查询预取统计，同步补充下载尾部的查询计为refresh，不计入命中"""
+        total: int = self.hit_count + self.miss_count + self.refresh_count
+        return {
+            "hit": self.hit_count,
+            "miss": self.miss_count,
+            "refresh": self.refresh_count,
+            "hit_rate": self.hit_count / total if total else 0,
+            "entries": len(self.entries),
+            "pending": self.queue.qsize()
+        }
+
+
+def get_tick_windows(start: date, end: date) -> List[Tuple[str, str]]:
+    """按天切分Tick下载窗口，每个窗口从当日10时到次日10时"""
+    windows: List[Tuple[str, str]] = []
+    stime: date = start
+    while stime < end:
+        windows.append((
+            stime.strftime('%Y%m%d')+"10",
+            (stime+timedelta(days=1)).strftime('%Y%m%d')+"10"
+        ))
+        stime = stime + timedelta(days=1)
+    return windows
+
+
+def get_bar_windows(start: date, end: date, days: int) -> List[Tuple[str, str]]:
+    """按天数切分K线下载窗口，每个窗口从首日01时到末日次日08时"""
+    windows: List[Tuple[str, str]] = []
+    days = max(days, 1)
+    stime: date = start
+    while stime <= end:
+        etime: date = min(stime + timedelta(days=days - 1), end)
+        windows.append((
+            stime.strftime('%Y%m%d')+"01",
+            (etime+timedelta(days=1)).strftime('%Y%m%d')+"08"
+        ))
+        stime = etime + timedelta(days=1)
+    return windows
+
+
+def to_timestamp(dt: datetime) -> int:
+    """将北京时间转换为UTC纳秒时间戳"""
+    return int(np.datetime64(dt.replace(tzinfo=None), "ns").astype("i8")) - CHINA_OFFSET
+
+
+def rows_to_bar_array(rows: List[dict]) -> ndarray:
+    """将getquotehistory返回的K线转换为列式数据"""
+    array: ndarray = np.empty(len(rows), dtype=BAR_DTYPE)
+    if not rows:
+        return array
+
+    array["datetime"] = np.array([row["DateTime"] for row in rows], dtype="datetime64[ns]").astype("i8") - CHINA_OFFSET
+    array["open"] = [row["Open"] for row in rows]
+    array["high"] = [row["High"] for row in rows]
+    array["low"] = [row["Low"] for row in rows]
+    array["close"] = [row["Close"] for row in rows]
+    array["volume"] = [row["Volume"] for row in rows]
+    array["open_interest"] = [row.get("OpenInterest", 0) or 0 for row in rows]
+    return array
+
+
+def rows_to_tick_array(rows: List[dict]) -> ndarray:
+    """将getquotehistory返回的Tick转换为列式数据"""
+    array: ndarray = np.empty(len(rows), dtype=TICK_DTYPE)
+    if not rows:
+        return array
+
+    # 一次遍历读取所有字段，其余转换在数组上完成
+    try:
+        raw: ndarray = np.array(list(map(tick_row_getter, rows)), dtype=TICK_ROW_DTYPE)
+    except (KeyError, TypeError, ValueError):
+        # 部分字段缺失或为空时逐个字段读取
+        raw: ndarray = np.array(
+            [(row["DateTime"],) + tuple(row.get(key, 0) or 0 for key in TICK_ROW_FIELDS[1:]) for row in rows],
+            dtype=TICK_ROW_DTYPE
+        )
+
+    array["datetime"] = DatetimeIndex(raw["datetime"]).values.astype("datetime64[ns]").view("i8") - CHINA_OFFSET
+    # 空值（转换后为NaN）调整为0
+    for name in TICK_DTYPE.names[1:]:
+        column: ndarray = raw[name]
+        array[name] = np.where(np.isnan(column), 0, column)
+
+    # 异常的浮点数最大值调整为0
+    for name in ("last_price", "bid_price_1", "ask_price_1"):
+        column: ndarray = array[name]
+        column[column == MAX_FLOAT] = 0
+    return array
+
+
+def tick_array_to_ticks(array: ndarray, symbol: str, exchange: Exchange) -> List[TickData]:
+    """将列式Tick数据转换为TickData列表"""
+    dts: ndarray = DatetimeIndex(array["datetime"]).tz_localize("UTC").tz_convert(CHINA_TZ).to_pydatetime()
+    last_prices: list = array["last_price"].tolist()
+
+    # 基于Tick模板复制字段，跳过数据类构造函数的逐个参数匹配
+    template: dict = TickData(
+        symbol=symbol,
+        exchange=exchange,
+        datetime=None,
+        gateway_name="ICETCore"
+    ).__dict__
+
+    # 批量创建对象期间暂停循环垃圾回收，TickData之间没有循环引用，避免反复扫描新建的对象
+    gc_enabled: bool = gc.isenabled()
+    gc.disable()
+    try:
+        ticks: List[TickData] = []
+        for dt, last_price, volume, open_interest, bid_price_1, ask_price_1, bid_volume_1, ask_volume_1 in zip(
+            dts,
+            last_prices,
+            array["volume"].tolist(),
+            array["open_interest"].tolist(),
+            array["bid_price_1"].tolist(),
+            array["ask_price_1"].tolist(),
+            array["bid_volume_1"].tolist(),
+            array["ask_volume_1"].tolist()
+        ):
+            tick: TickData = TickData.__new__(TickData)
+            tick.__dict__ = {
+                **template,
+                "datetime": dt,
+                "open_price": last_price,
+                "high_price": last_price,
+                "low_price": last_price,
+                "last_price": last_price,
+                "volume": volume,
+                "open_interest": open_interest,
+                "bid_price_1": bid_price_1,
+                "ask_price_1": ask_price_1,
+                "bid_volume_1": bid_volume_1,
+                "ask_volume_1": ask_volume_1
+            }
+            ticks.append(tick)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return ticks
+
+
+def drop_boundary_duplicates(prev: ndarray, array: ndarray, unique_time: bool) -> ndarray:
+    """
+    去除array开头与prev末尾时间重叠部分中已在prev出现的记录。
+
+    unique_time为True时按时间戳判断重复（K线），否则按整条记录判断（Tick同一时间戳可能有多笔）。
+    """
+    if not len(prev) or not len(array):
+        return array
+
+    overlap: int = np.searchsorted(array["datetime"], prev["datetime"][-1], side="right")
+    if not overlap:
+        return array
+
+    head: ndarray = array[:overlap]
+    tail: ndarray = prev[np.searchsorted(prev["datetime"], head["datetime"][0], side="left"):]
+    if unique_time:
+        mask: ndarray = ~np.isin(head["datetime"], tail["datetime"])
+    else:
+        rows: set = set(tail.tolist())
+        mask: ndarray = np.array([row not in rows for row in head.tolist()], dtype=bool)
+    return np.concatenate([head[mask], array[overlap:]])
+
+
+def merge_window_arrays(arrays: List[ndarray], unique_time: bool) -> Tuple[ndarray, int]:
+    """按窗口顺序线性合并各窗口数据，去除边界重复，返回合并数据和去除的条数"""
+    parts: List[ndarray] = []
+    duplicates: int = 0
+    ordered: bool = True
+
+    for array in arrays:
+        if not len(array):
+            continue
+
+        if parts:
+            prev: ndarray = parts[-1]
+            size: int = len(array)
+            array = drop_boundary_duplicates(prev, array, unique_time)
+            duplicates += size - len(array)
+            if not len(array):
+                continue
+
+            # 重叠区间内未重复的记录会早于上一窗口末尾，合并后需要重新排序
+            if array["datetime"][0] < prev["datetime"][-1]:
+                ordered = False
+
+        parts.append(array)
+
+    if not parts:
+        return arrays[0], duplicates
+
+    data: ndarray = np.concatenate(parts)
+    if not ordered:
+        # 数据由若干有序段组成，稳定排序（TimSort）的代价接近线性
+        data = data[np.argsort(data["datetime"], kind="stable")]
+    return data, duplicates
+
+
+def bar_array_to_bars(
+    array: ndarray,
+    symbol: str,
+    exchange: Exchange,
+    interval: Interval
+) -> List[BarData]:
+    """将列式K线数据转换为BarData列表"""
+    dts: list = (array["datetime"] + CHINA_OFFSET).view("datetime64[ns]").astype("datetime64[us]").tolist()
+
+    data: List[BarData] = []
+    for dt, open_price, high_price, low_price, close_price, volume, open_interest in zip(
+        dts,
+        array["open"].tolist(),
+        array["high"].tolist(),
+        array["low"].tolist(),
+        array["close"].tolist(),
+        array["volume"].tolist(),
+        array["open_interest"].tolist()
+    ):
+        bar: BarData = BarData(
+            symbol=symbol,
+            exchange=exchange,
+            interval=interval,
+            datetime=dt.replace(tzinfo=CHINA_TZ),
+            open_price=open_price,
+            high_price=high_price,
+            low_price=low_price,
+            close_price=close_price,
+            volume=volume,
+            open_interest=open_interest,
+            gateway_name="ICETCore"
+        )
+        data.append(bar)
+    return data
@@ -1,13 +1,17 @@
 import sys
+from fnmatch import fnmatchcase
 from datetime import datetime
-from time import sleep
+from time import sleep, perf_counter, time
+from threading import Thread, Lock, Event, Condition
 from typing import Dict, List, Tuple, Set
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 from datetime import datetime, timedelta
 
 
 from vnpy.trader.setting import SETTINGS
 from vnpy.trader.utility import ZoneInfo, ZoneInfo
-from vnpy.event import EventEngine
+from vnpy.event import EventEngine, Event as VnEvent
+from vnpy.trader.event import EVENT_TIMER
 from vnpy.trader.constant import (
     Direction,
     Offset,
@@ -15,7 +19,8 @@ from vnpy.trader.constant import (
     OrderType,
     Product,
     Status,
-    OptionType
+    OptionType,
+    Interval
 )
 from vnpy.trader.gateway import BaseGateway
 from vnpy.trader.object import (
@@ -27,10 +32,21 @@ from vnpy.trader.object import (
     ContractData,
     OrderRequest,
     CancelRequest,
-    SubscribeRequest
+    SubscribeRequest,
+    HistoryRequest
 )
 
 from vnpy.trader.datafeed import BaseDatafeed
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from .icetcore_cache import ContractCache
+from .icetcore_session import session_manager
+from .icetcore_latency import LatencyRecorder
+from .icetcore_product import product_classifier, get_symbol_head
 from icetcore import (TCoreAPI,
                     QuoteEvent,
                     TradeEvent,
@@ -161,6 +177,62 @@ OPTIONTYPE_ICE2VT: Dict[str, OptionType] = {
 }
 
 
+# 行情推送字段映射（TickData字段, ICE字段）
+TICK_VALUE_FIELDS: List[Tuple[str, str]] = [
+    ("volume", "Volume"),
+    ("turnover", "Turnover"),
+    ("limit_up", "UpperLimit"),
+    ("limit_down", "LowerLimit"),
+    ("bid_volume_1", "BidVolume"),
+    ("ask_volume_1", "AskVolume")
+]
+TICK_PRICE_FIELDS: List[Tuple[str, str]] = [
+    ("last_price", "Last"),
+    ("open_price", "Open"),
+    ("high_price", "High"),
+    ("low_price", "Low"),
+    ("pre_close", "YClosedPrice"),
+    ("bid_price_1", "Bid"),
+    ("ask_price_1", "Ask")
+]
+TICK_DEPTH_PRICE_FIELDS: List[Tuple[str, str]] = [
+    ("bid_price_2", "Bid1"),
+    ("bid_price_3", "Bid2"),
+    ("bid_price_4", "Bid3"),
+    ("bid_price_5", "Bid4"),
+    ("ask_price_2", "Ask1"),
+    ("ask_price_3", "Ask2"),
+    ("ask_price_4", "Ask3"),
+    ("ask_price_5", "Ask4")
+]
+TICK_DEPTH_VOLUME_FIELDS: List[Tuple[str, str]] = [
+    ("bid_volume_2", "BidVolume1"),
+    ("bid_volume_3", "BidVolume2"),
+    ("bid_volume_4", "BidVolume3"),
+    ("bid_volume_5", "BidVolume4"),
+    ("ask_volume_2", "AskVolume1"),
+    ("ask_volume_3", "AskVolume2"),
+    ("ask_volume_4", "AskVolume3"),
+    ("ask_volume_5", "AskVolume4")
+]
+
+# 合约加载分组（代码类型：名称）
+CONTRACT_FAMILY_NAMES: Dict[str, str] = {
+    "F": "期货",
+    "O": "期权",
+    "F2": "价差",
+    "S": "证券"
+}
+PRODUCT_FAMILY_MAP: Dict[Product, str] = {
+    Product.FUTURES: "F",
+    Product.OPTION: "O",
+    Product.SPREAD: "F2"
+}
+CONTRACT_CHUNK_SIZE: int = 200
+
+# 已结束委托的归档数量上限
+ORDER_ARCHIVE_SIZE: int = 10000
+
 # 其他常量
 MAX_FLOAT = sys.float_info.max                  # 浮点数极限值
 CHINA_TZ = ZoneInfo("Asia/Shanghai")       # 中国时区
@@ -168,11 +240,25 @@ CHINA_TZ = ZoneInfo("Asia/Shanghai")       # 中国时区
 # 合约数据全局缓存字典
 symbol_contract_map: Dict[str, ContractData] = {}
 
+# ICE原始代码索引字典（ICE代码：(合约键, 合约数据)）
+symbol_index_map: Dict[str, Tuple[str, ContractData]] = {}
+
 
 class IceTCoreGateway(BaseGateway,BaseDatafeed):
     default_name: str = "ICETCore"
     default_setting: Dict[str, str] = {
-        "客户端路径": "C:/AlgoMaster2/APPs64"
+        "客户端路径": "C:/AlgoMaster2/APPs64",
+        "行情合并间隔(毫秒)": 0,
+        "委托确认超时(秒)": 5,
+        "合约加载线程数": 4,
+        "连接时等待合约加载": ["否", "是"],
+        "合约过滤交易所": "",
+        "合约过滤产品": "",
+        "合约过滤代码": "",
+        "预取历史天数": 0,
+        "预取合约列表": "",
+        "持仓资金全量推送间隔(秒)": 0,
+        "延时统计输出间隔(秒)": 0
     }
 
     exchanges: List[str] = list(EXCHANGE_ICE2VT.values())
@@ -197,90 +283,401 @@ class IceTCoreGateway(BaseGateway,BaseDatafeed):
         self.login_failed: bool = False
         self.auth_failed: bool = False
         self.contract_inited: bool = False
+        self.early_tradeids: Set[str] = set()
+        self.trade_replayed: bool = False
 
         self.userid: str = ""
         self.brokerid: str = ""
         self.auth_code: str = ""
 
+        self.index_hit: int = 0
+        self.index_miss: int = 0
+
+        self.tick_conflater: "TickConflater" = None
+        self.contract_cache: ContractCache = ContractCache()
+        self.contract_workers: int = 4
+        self.contract_ready: Set[Tuple[Exchange, str]] = set()
+        self.contract_condition: Condition = Condition()
+
+        self.filter_exchanges: Set[str] = set()
+        self.filter_products: Set[str] = set()
+        self.filter_patterns: List[str] = []
+        self.resolver: ContractResolver = ContractResolver(gateway_name, False)
+        self.prefetch_days: int = 0
+
+        self.order_store: OrderStore = OrderStore(ORDER_ARCHIVE_SIZE)
+        self.order_lock: Lock = Lock()          # 确认延时、成交时间等统计数据
+        self.submit_lock: Lock = Lock()         # 委托提交，不与推送回调共用
+        self.order_timeout: float = 5
+        self.order_condition: Condition = Condition()
+        self.order_report_count: int = 0
+
+        self.ack_count: int = 0
+        self.ack_total: float = 0
+        self.ack_max: float = 0
+        self.ack_last: float = 0
+
+        # 延时统计，设置输出间隔后启用，未启用时推送回调中只做一次空值判断
+        self.latency_recorder: LatencyRecorder = None
+        self.latency_interval: int = 0
+        self.latency_count: int = 0
+        self.order_send_times: Dict[str, float] = {}
+        self.early_fill_times: Dict[str, float] = {}
+
+        # 确认超时的委托先以委托编号（ordid）推送，收到确认后ReportID的回报按该编号推送
+        self.pending_acks: Set[str] = set()
+        self.ack_reportids: Dict[str, str] = {}        # 委托编号：ReportID
+        self.ack_orderids: Dict[str, str] = {}         # ReportID：委托编号
+
     def connect(self, setting: dict) -> None:
         """连接交易接口"""
-        self.api=TCoreAPI(apppath=setting["客户端路径"],eventclass=self.eventobj)
+        self.order_timeout = float(setting.get("委托确认超时(秒)", 5))
+        self.contract_workers = max(int(setting.get("合约加载线程数", 4)), 1)
+        self.filter_exchanges = set(split_setting(setting.get("合约过滤交易所", "")))
+        self.filter_products = set(split_setting(setting.get("合约过滤产品", "")))
+        self.filter_patterns = split_setting(setting.get("合约过滤代码", ""))
+        self.prefetch_days = int(setting.get("预取历史天数", 0))
+        self.eventobj.snapshot_interval = float(setting.get("持仓资金全量推送间隔(秒)", 0))
+
+        conflate_interval: int = int(setting.get("行情合并间隔(毫秒)", 0))
+        if conflate_interval > 0 and not self.tick_conflater:
+            self.tick_conflater = TickConflater(self, conflate_interval / 1000)
+            self.tick_conflater.start()
+
+        self.latency_interval = int(setting.get("延时统计输出间隔(秒)", 0))
+        if self.latency_interval > 0 and not self.latency_recorder:
+            self.latency_recorder = LatencyRecorder()
+            self.event_engine.register(EVENT_TIMER, self.process_timer_event)
+
         # 禁止重复发起连接，会导致异常崩溃
         if not self.connect_status:
-            self.api.connect()#(self.appid,self.auth_code)
+            # 连接由进程内共享，数据服务的历史数据请求可复用该连接
+            self.eventobj.active = True
+            self.api = session_manager.acquire(setting["客户端路径"], self.eventobj)
+            self.resolver.api = self.api
             self.connect_status = True
-            self.qryInstrument()
+            self.trade_replayed = False
+            # 后台加载合约，已就绪的品种可先行交易，未就绪时subscribe和send_order找不到合约
+            Thread(target=self.qryInstrument, daemon=True).start()
+            if setting.get("连接时等待合约加载", "否") == "是":
+                self.wait_contract_ready()
+
+            # 预取关注列表中合约的近期K线
+            if self.prefetch_days:
+                for vt_symbol in split_setting(setting.get("预取合约列表", "")):
+                    symbol, _, exchange = vt_symbol.rpartition(".")
+                    try:
+                        self.prefetch_history(symbol, Exchange(exchange))
+                    except ValueError:
+                        self.write_log(f"预取合约代码错误：{vt_symbol}")
         #self.init_query()
 
     def subscribe(self, req: SubscribeRequest) -> None:
         """订阅行情"""
         self.write_log("订阅行情"+req.symbol)
 
-        contract: ContractData = symbol_contract_map.get(EXCHANGE_VT2ICE[req.exchange]+"."+req.symbol, None)
-        symbolhead="TC.S."
-        if contract.product==Product.FUTURES:
-            symbolhead="TC.F."
-        elif contract.product==Product.OPTION:
-            symbolhead="TC.O."
-        elif contract.product==Product.SPREAD:
-            symbolhead="TC.F2." 
+        contract: ContractData = self.find_contract(req.exchange, req.symbol)
+        if not contract:
+            self.write_log(f"订阅行情失败，找不到合约：{req.vt_symbol}")
+            return
+
+        symbolhead: str = get_symbol_head(contract.product)
         self.api.subquote(symbolhead+contract.name)
         self.subscribed.add(symbolhead+contract.name)
+
+        if self.prefetch_days:
+            self.prefetch_history(req.symbol, req.exchange)
         #print(symbolhead+EXCHANGE_VT2ICE[req.exchange]+"."+req.symbol)
         #self.api.subquote(symbolhead+EXCHANGE_VT2ICE[req.exchange]+"."+req.symbol)
         #self.subscribed.add(symbolhead+EXCHANGE_VT2ICE[req.exchange]+"."+req.symbol)
 
+    def prefetch_history(self, symbol: str, exchange: Exchange) -> None:
+        """通过全局数据服务在后台预取近期分钟K线"""
+        from vnpy.trader.datafeed import get_datafeed
+        from .icetcore_datafeed import IceTCoreDatafeed
+
+        datafeed: BaseDatafeed = get_datafeed()
+        if not isinstance(datafeed, IceTCoreDatafeed):
+            return
+
+        end: datetime = datetime.now(CHINA_TZ)
+        req: HistoryRequest = HistoryRequest(
+            symbol=symbol,
+            exchange=exchange,
+            start=end - timedelta(days=self.prefetch_days),
+            end=end,
+            interval=Interval.MINUTE
+        )
+        datafeed.init(lambda msg: None)
+        datafeed.prefetcher.put(req)
+
     def send_order(self, req: OrderRequest) -> str:
         """委托下单"""
+        return self.send_orders([req])[0]
+
+    def send_orders(self, reqs: List[OrderRequest]) -> List[str]:
+        """批量委托下单，按请求顺序返回vt_orderid，失败的委托返回空字符串"""
+        contracts: Dict[str, ContractData] = {}
+        structs: List[OrderStruct] = []
+        for req in reqs:
+            if req.vt_symbol not in contracts:
+                contracts[req.vt_symbol] = self.find_contract(req.exchange, req.symbol)
+            structs.append(self.create_order_struct(req, contracts[req.vt_symbol]))
+
+        # 一次加锁连续提交全部委托，确认等待在锁外进行
+        submitted: List[Tuple[str, float]] = []
+        with self.submit_lock:
+            for order_struct in structs:
+                if not order_struct:
+                    submitted.append(None)
+                    continue
+
+                self.order_ref += 1
+                start: float = perf_counter()
+                ordid,msg = self.api.neworder(order_struct)
+                if not ordid:
+                    self.write_log(f"委托请求发送失败，错误代码：{msg}")
+                    submitted.append(None)
+                else:
+                    submitted.append((ordid, start))
+
+        vt_orderids: List[str] = []
+        for req, result in zip(reqs, submitted):
+            if not result:
+                vt_orderids.append("")
+                continue
+
+            ordid, start = result
+            orderidlist: list = self.wait_order_ack(ordid, start)
+            if not orderidlist:
+                # 委托已被接受，以委托编号返回并推送提交中状态，确认到达后的回报沿用该编号
+                self.write_log(f"委托确认超时，委托编号：{ordid}，确认到达后继续推送委托更新")
+                with self.order_lock:
+                    self.pending_acks.add(ordid)
+
+                order: OrderData = req.create_order_data(ordid, self.default_name)
+                if self.order_store.update(order):
+                    self.on_order(order)
+                vt_orderids.append(order.vt_orderid)
+                continue
+
+            for orderid in orderidlist:
+                if self.latency_recorder:
+                    self.record_send_time(orderid['ReportID'], start)
+
+                order: OrderData = req.create_order_data(orderid['ReportID'], self.default_name)
+                if self.order_store.update(order, True):
+                    self.on_order(order)
+            vt_orderids.append(order.vt_orderid)
+
+        failed: int = vt_orderids.count("")
+        if len(reqs) > 1 and failed:
+            self.write_log(f"批量委托{len(reqs)}笔，失败{failed}笔")
+        return vt_orderids
+
+    def create_order_struct(self, req: OrderRequest, contract: ContractData) -> OrderStruct:
+        """检查委托请求并生成委托结构，检查不通过返回None"""
         if req.offset not in OFFSET_VT2ICE:
             self.write_log("请选择开平方向")
-            return ""
+            return None
 
         if req.type not in ORDERTYPE_VT2ICE:
             self.write_log(f"当前接口不支持该类型的委托{req.type.value}")
-            return ""
-
-        self.order_ref += 1
-        contract: ContractData = symbol_contract_map.get(EXCHANGE_VT2ICE[req.exchange]+"."+req.symbol, None)
-        symbolhead="TC.S."
-        if contract.product==Product.FUTURES:
-            symbolhead="TC.F."
-        elif contract.product==Product.OPTION:
-            symbolhead="TC.O." 
-        elif contract.product==Product.SPREAD:
-            symbolhead="TC.F2." 
+            return None
+
+        if not contract:
+            self.write_log(f"委托合约不存在{req.vt_symbol}")
+            return None
+
+        symbolhead: str = get_symbol_head(contract.product)
         tp: tuple = ORDERTYPE_VT2ICE[req.type]
         price_type, time_condition = tp
-        OrderStruct.Symbol=symbolhead+contract.name#EXCHANGE_VT2ICE[req.exchange]+"."+req.symbol
-        OrderStruct.BrokerID=self.brokerid
-        OrderStruct.Account=self.userid
-        OrderStruct.Price=req.price
-        OrderStruct.TimeInForce=time_condition
-        OrderStruct.Side= DIRECTION_VT2ICE.get(req.direction, "")
-        OrderStruct.OrderType=price_type
-        OrderStruct.OrderQty=int(req.volume)
-        OrderStruct.PositionEffect=OFFSET_VT2ICE.get(req.offset, "")#PositionEffect.Auto
-        OrderStruct.Synthetic=0
-        OrderStruct.SelfTradePrevention=3
-
-        ordid,msg = self.api.neworder(OrderStruct)
-        if not ordid:
-            self.write_log(f"委托请求发送失败，错误代码：{msg}")
-            return ""
+
+        # 每次下单使用独立的委托结构，避免多线程下单时字段互相覆盖
+        order_struct: OrderStruct = OrderStruct()
+        order_struct.Symbol=symbolhead+contract.name#EXCHANGE_VT2ICE[req.exchange]+"."+req.symbol
+        order_struct.BrokerID=self.brokerid
+        order_struct.Account=self.userid
+        order_struct.Price=req.price
+        order_struct.TimeInForce=time_condition
+        order_struct.Side= DIRECTION_VT2ICE.get(req.direction, "")
+        order_struct.OrderType=price_type
+        order_struct.OrderQty=int(req.volume)
+        order_struct.PositionEffect=OFFSET_VT2ICE.get(req.offset, "")#PositionEffect.Auto
+        order_struct.Synthetic=0
+        order_struct.SelfTradePrevention=3
+        return order_struct
+
+    def wait_order_ack(self, ordid: str, start: float) -> list:
+        """等待委托确认，由委托回报推送唤醒，超时返回None"""
+        deadline: float = start + self.order_timeout
         while True:
-            if self.api.getorderinfo(ordid):
-                orderidlist: str = self.api.getorderinfo(ordid)
+            with self.order_condition:
+                report_count: int = self.order_report_count
+
+            orderinfo: list = self.api.getorderinfo(ordid)
+            if orderinfo:
                 break
-        for orderid in orderidlist:
-            order: OrderData = req.create_order_data(orderid['ReportID'], self.default_name)
-            self.on_order(order)
-        return order.vt_orderid
+
+            remaining: float = deadline - perf_counter()
+            if remaining <= 0:
+                return None
+
+            # 查询期间没有新回报时才等待，并定期复查以防回报早于委托信息写入
+            with self.order_condition:
+                if report_count == self.order_report_count:
+                    self.order_condition.wait(min(remaining, 0.05))
+
+        latency: float = perf_counter() - start
+        with self.order_lock:
+            self.ack_count += 1
+            self.ack_total += latency
+            self.ack_max = max(self.ack_max, latency)
+            self.ack_last = latency
+
+        if self.latency_recorder:
+            self.latency_recorder.record("order.ack", latency)
+        return orderinfo
+
+    def check_pending_acks(self) -> None:
+        """查询确认超时的委托，已确认的登记ReportID与委托编号的对应关系"""
+        with self.order_lock:
+            ordids: List[str] = list(self.pending_acks)
+
+        for ordid in ordids:
+            orderinfo: list = self.api.getorderinfo(ordid)
+            if not orderinfo:
+                continue
+
+            reportid: str = orderinfo[-1]["ReportID"]
+            with self.order_lock:
+                if ordid not in self.pending_acks:
+                    continue
+                self.pending_acks.discard(ordid)
+                self.ack_reportids[ordid] = reportid
+                self.ack_orderids[reportid] = ordid
+                trim_times(self.ack_reportids)
+                trim_times(self.ack_orderids)
+            self.write_log(f"委托确认超时后收到确认，委托编号：{ordid}，ReportID：{reportid}")
+
+    def get_report_orderid(self, reportid: str) -> str:
+        """将回报中的ReportID转换为推送使用的委托编号"""
+        if self.pending_acks:
+            self.check_pending_acks()
+        if not self.ack_orderids:
+            return reportid
+        return self.ack_orderids.get(reportid, reportid)
+
+    def record_send_time(self, orderid: str, start: float) -> None:
+        """委托确认后记录发出时间，成交已先于确认到达时直接统计下单到首笔成交的延时"""
+        with self.order_lock:
+            fill_time: float = self.early_fill_times.pop(orderid, None)
+            if fill_time is None:
+                self.order_send_times[orderid] = start
+                trim_times(self.order_send_times)
+                return
+        self.latency_recorder.record("order.fill", fill_time - start)
+
+    def record_fill_time(self, orderid: str, now: float) -> None:
+        """成交到达时统计下单到首笔成交的延时，委托尚未确认时先记录成交时间"""
+        with self.order_lock:
+            send_time: float = self.order_send_times.pop(orderid, None)
+            if send_time is None:
+                self.early_fill_times.setdefault(orderid, now)
+                trim_times(self.early_fill_times)
+                return
+        self.latency_recorder.record("order.fill", now - send_time)
+
+    def get_order(self, orderid: str) -> OrderData:
+        """通过委托编号（ReportID）查询委托"""
+        return self.order_store.get(orderid)
+
+    def get_push_statistics(self) -> Dict[str, int]:
+        """查询持仓和资金推送中因无变化而省略的次数"""
+        return {
+            "position_suppressed": self.eventobj.position_suppressed,
+            "account_suppressed": self.eventobj.account_suppressed,
+            "positions": len(self.eventobj.position_states),
+            "accounts": len(self.eventobj.account_states)
+        }
+
+    def get_latency_snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        查询各环节延时分布（毫秒），未启用延时统计时返回空字典
+
+        quote.convert/quote.dispatch为行情转换和分发耗时，quote.exchange为交易所时间到本地接收的延时，
+        order.ack/order.fill为下单到委托确认和首笔成交的延时，order.report/trade.report为回报处理耗时。
+        """
+        if not self.latency_recorder:
+            return {}
+        return self.latency_recorder.get_snapshot()
+
+    def process_timer_event(self, event: VnEvent) -> None:
+        """定时输出延时统计"""
+        self.latency_count += 1
+        if self.latency_count < self.latency_interval:
+            return
+        self.latency_count = 0
+
+        for name, data in self.get_latency_snapshot().items():
+            self.write_log(
+                f"延时统计{name}：{data['count']}次，平均{data['avg']:.3f}毫秒，"
+                f"P50 {data['p50']:.3f}，P99 {data['p99']:.3f}，"
+                f"P99.9 {data['p99.9']:.3f}，最大{data['max']:.3f}"
+            )
+
+    def get_order_ack_latency(self) -> Dict[str, float]:
+        """查询委托确认延时统计（毫秒）"""
+        return {
+            "count": self.ack_count,
+            "avg": self.ack_total / self.ack_count * 1000 if self.ack_count else 0,
+            "max": self.ack_max * 1000,
+            "last": self.ack_last * 1000
+        }
 
     def cancel_order(self, req: CancelRequest) -> None:
         """委托撤单"""
        #print(req.orderid)
         #self.api.getorderinfo(req.orderid)['ReportID']
-        self.api.cancelorder(req.orderid)
+        self.cancel_orders([req])
+
+    def cancel_orders(self, reqs: List[CancelRequest]) -> List[bool]:
+        """批量委托撤单，按请求顺序返回撤单请求是否发送成功，已结束的委托不再发送"""
+        results: List[bool] = []
+        for req in reqs:
+            order: OrderData = self.order_store.get(req.orderid)
+            if order and not order.is_active():
+                self.write_log(f"撤单失败，委托已结束，委托编号：{req.orderid}")
+                results.append(False)
+                continue
+
+            # 确认超时的委托需先取得ReportID才能撤单
+            if req.orderid in self.pending_acks:
+                self.check_pending_acks()
+                if req.orderid in self.pending_acks:
+                    self.write_log(f"撤单失败，委托尚未确认，委托编号：{req.orderid}")
+                    results.append(False)
+                    continue
+            reportid: str = self.ack_reportids.get(req.orderid, req.orderid)
+
+            try:
+                result = self.api.cancelorder(reportid)
+            except Exception as e:
+                self.write_log(f"撤单请求发送失败，委托编号：{req.orderid}，{e!r}")
+                results.append(False)
+                continue
+
+            # 与neworder相同的(结果, 错误信息)返回格式时检查结果
+            if isinstance(result, tuple) and len(result) == 2 and not result[0]:
+                self.write_log(f"撤单请求发送失败，委托编号：{req.orderid}，错误代码：{result[1]}")
+                results.append(False)
+                continue
+            results.append(True)
+
+        failed: int = results.count(False)
+        if len(reqs) > 1 and failed:
+            self.write_log(f"批量撤单{len(reqs)}笔，失败{failed}笔")
+        return results
 
     def query_account(self) -> None:
         """查询资金"""
@@ -294,8 +691,18 @@ class IceTCoreGateway(BaseGateway,BaseDatafeed):
 
     def close(self) -> None:
         """关闭连接"""
+        if self.tick_conflater:
+            self.tick_conflater.stop()
+            self.tick_conflater = None
         if self.connect_status:
-            self.api.disconnect()
+            # 连接仍被数据服务引用时不会断开，先退订行情并停止处理推送
+            self.eventobj.active = False
+            for symbol in self.subscribed:
+                self.api.unsubquote(symbol)
+            self.subscribed.clear()
+
+            session_manager.release(self.api)
+            self.connect_status = False
 
     def write_error(self, msg: str, error: dict) -> None:
         """输出错误信息日志"""
@@ -304,131 +711,199 @@ class IceTCoreGateway(BaseGateway,BaseDatafeed):
         msg: str = f"{msg}，代码：{error_id}，信息：{error_msg}"
         self.write_log(msg)
 
+    def get_contract(self, data: dict) -> ContractData:
+        """通过推送数据中的ICE代码查询合约"""
+        ice_symbol: str = data["Symbol"]
+        index: Tuple[str, ContractData] = symbol_index_map.get(ice_symbol, None)
+        if index:
+            self.index_hit += 1
+            return index[1]
+
+        # 索引未命中（如主力连续代码），按原方式解析后加入索引
+        self.index_miss += 1
+        if "TC.F2." not in ice_symbol:
+            key: str = ice_symbol.split(".")[2]+"."+self.api.getsymbol_id(ice_symbol)
+        else:
+            key: str = data["Exchange"]+"."+ice_symbol.replace("TC.F2.","")
+        contract: ContractData = symbol_contract_map.get(key, None)
+        if not contract:
+            contract = self.resolve_lazy_contract(ice_symbol, key)
+        if contract:
+            symbol_index_map[ice_symbol] = (key, contract)
+        return contract
+
+    def find_contract(self, exchange: Exchange, symbol: str) -> ContractData:
+        """通过交易所和代码查询合约，未加载的合约按需加载"""
+        key: str = EXCHANGE_VT2ICE[exchange]+"."+symbol
+        contract: ContractData = symbol_contract_map.get(key, None)
+        if not contract:
+            contract = self.resolve_lazy_contract("", key)
+        return contract
+
+    def filter_contract(self, symb: str) -> bool:
+        """检查ICE代码是否满足合约过滤设置"""
+        symbcheck: List[str] = symb.split(".")
+        if len(symbcheck) < 4:
+            return True
+        if self.filter_exchanges and symbcheck[2] not in self.filter_exchanges:
+            return False
+        if self.filter_products and product_classifier.classify(symb).value not in self.filter_products:
+            return False
+        if self.filter_patterns and not any(fnmatchcase(symb, pattern) for pattern in self.filter_patterns):
+            return False
+        return True
+
+    def resolve_lazy_contract(self, ice_symbol: str, key: str) -> ContractData:
+        """加载被过滤的合约"""
+        ice_symbol, contract = self.resolver.resolve(key, ice_symbol)
+        if contract:
+            self.add_contract(ice_symbol, contract)
+        return contract
+
+    def load_contracts(self, symbols: List[str]) -> List[Tuple[str, ContractData]]:
+        """在线程池中批量查询合约信息，单个合约查询失败时记录日志并跳过"""
+        results: List[Tuple[str, ContractData]] = []
+        for symb in symbols:
+            try:
+                contract: ContractData = load_contract(self.api, symb, self.default_name)
+            except Exception as e:
+                self.write_log(f"合约信息查询失败：{symb}，{e!r}")
+                contract = None
+            results.append((symb, contract))
+        return results
+
+    def add_contract(self, symb: str, contract: ContractData) -> None:
+        """登记合约索引并推送合约"""
+        key: str = symb.split(".")[2]+"."+contract.symbol
+        symbol_contract_map[key] = contract
+        symbol_index_map[symb] = (key, contract)
+        self.on_contract(contract)
+
+    def set_contract_ready(self, group: Tuple[Exchange, str]) -> None:
+        """标记交易所品种的合约已加载完成"""
+        exchange, family = group
+        if not family:
+            return
+        with self.contract_condition:
+            self.contract_ready.add(group)
+            self.contract_condition.notify_all()
+        self.write_log(f"{exchange.value}{CONTRACT_FAMILY_NAMES.get(family, family)}合约加载完成")
+
+    def is_contract_ready(self, exchange: Exchange, product: Product) -> bool:
+        """查询交易所品种的合约是否已加载完成"""
+        family: str = PRODUCT_FAMILY_MAP.get(product, "S")
+        return (exchange, family) in self.contract_ready
+
+    def wait_contract_ready(self, exchange: Exchange = None, product: Product = None, timeout: float = None) -> bool:
+        """等待交易所品种的合约加载完成，不传交易所时等待全部合约，返回是否已就绪"""
+        with self.contract_condition:
+            if not exchange:
+                self.contract_condition.wait_for(lambda: self.trade_replayed, timeout)
+                return self.contract_inited
+
+            return self.contract_condition.wait_for(
+                lambda: self.is_contract_ready(exchange, product) or self.trade_replayed,
+                timeout
+            ) and self.is_contract_ready(exchange, product)
+
     def qryInstrument(self):
-        """合约查询回报"""
+        """合约查询回报，在后台线程中运行，加载异常时记录日志并结束成交回放"""
+        try:
+            self.load_instruments()
+        except Exception as e:
+            self.write_log(f"合约信息加载失败：{e!r}")
+        finally:
+            with self.contract_condition:
+                self.trade_replayed = True
+                self.early_tradeids.clear()
+                self.contract_condition.notify_all()
+
+    def load_instruments(self) -> None:
+        """加载全部合约，推送初始持仓并回放当日委托和成交"""
+        start: float = perf_counter()
         data=self.api.getallsymbol()
         if data:
+            trading_day: str = self.eventobj.current_date
+            cached: Dict[str, ContractData] = self.contract_cache.load(trading_day)
+            contracts: Dict[str, ContractData] = {}
+            pending: List[str] = []
+            queried: int = 0
+
             for symb in data:
-                symbcheck=symb.split(".")
-                if len(symbcheck)>=4:
-                    if "TC.O." in symb:
-                        product: Product = Product.OPTION
-                    elif "TC.S.SSE.60" in symb or "TC.S.SSE.90" in symb or "TC.S.SZSE.00" in symb or "TC.S.SZSE.30" in symb or "TC.S.SZSE.20" in symb:
-                        product: Product = Product.EQUITY
-                    elif "TC.S.SSE.000" in symb or "TC.S.SZSE.399" in symb:
-                        product: Product = Product.INDEX
-                    elif "TC.S.SSE.51" in symb or "TC.S.SZSE.15" in symb:
-                        product: Product = Product.ETF
-                    elif "TC.S.SSE.01" in symb or "TC.S.SSE.11" in symb or "TC.S.SSE.20" in symb or "TC.S.SZSE.10" in symb or "TC.S.SZSE.12" in symb or "TC.S.SZSE.13" in symb:
-                        product: Product = Product.BOND
-                    elif "TC.S.SSE.50" in symb or "TC.S.SZSE.16" in symb:
-                        product: Product = Product.FUND
-                    elif  "TC.F2." in symb:
-                        product: Product = Product.SPREAD
-                    else:
-                        product: Product = Product.FUTURES
-                    symbol_id=self.api.getsymbol_id(symb)
-                    volume_multiple=self.api.getsymbolvolume_multiple(symb)
-                    symbol_ticksize=self.api.getsymbol_ticksize(symb)
-                    contract: ContractData = ContractData(
-                        symbol=symbol_id if "TC.F2." not in symb else symb.replace("TC.F2.",""),
-                        exchange=EXCHANGE_ICE2VT[symbcheck[2]] if symbcheck[2] in EXCHANGE_ICE2VT.keys() else Exchange.LOCAL,
-                        name=symb.replace(symbcheck[0]+"."+symbcheck[1]+".","") if "TC.F2." not in symb else symb.replace("TC.F2.",""),
-                        product=product,
-                        size=float(volume_multiple) if volume_multiple else 0.001,
-                        pricetick=float(symbol_ticksize) if symbol_ticksize else 1000,
-                        gateway_name=self.default_name
-                    )
-                    underlymap={"IO":"IF","HO":"IH","MO":"IM"}
-
-                    # 期权相关
-                    if contract.product == Product.OPTION:
-                        underlying=""
-                        if ".CFFEX." in symb:
-                            underlying=underlymap[symbcheck[3]]+symbcheck[4]
-                        else:
-                            underlying=symbcheck[3]+symbcheck[4]
-                        portfolio=""
-                        if ".CFFEX." in symb or "CZCE" in symb:
-                            portfolio=symbcheck[3]
-                        elif "SSE" in symb or "SZSE" in symb:
-                            portfolio=symbcheck[3]+"_O"
-                        else:
-                            portfolio=symbcheck[3]+"_o"
-
-                        strick=symb.replace(symbcheck[0]+"."+symbcheck[1]+"."+symbcheck[2]+"."+symbcheck[3]+"."+symbcheck[4]+"."+symbcheck[5]+".","")
-                        contract.option_portfolio =portfolio
-                        contract.option_underlying =underlying
-                        contract.option_type = OPTIONTYPE_ICE2VT.get(symbcheck[5], None)
-                        contract.option_strike = float(strick)
-                        contract.option_index = strick
-                        contract.option_expiry = datetime.strptime(self.api.getexpirationdate(symb), "%Y%m%d")
-                    symbol_contract_map[symbcheck[2]+"."+contract.symbol] = contract
-                    self.on_contract(contract)
-      
+                # 不满足过滤条件的合约，在首次引用时再加载
+                if not self.filter_contract(symb):
+                    self.resolver.add_symbol(symb)
+                    continue
+
+                contract: ContractData = cached.get(symb, None)
+                if contract:
+                    contracts[symb] = contract
+                    self.add_contract(symb, contract)
+                else:
+                    pending.append(symb)
+
+            # 统计各交易所各品种待加载数量，期权链最后加载
+            pending.sort(key=lambda symb: "TC.O." in symb)
+            group_count: Dict[Tuple[Exchange, str], int] = {}
+            for symb in data:
+                group: Tuple[Exchange, str] = get_contract_group(symb)
+                group_count.setdefault(group, 0)
+            for symb in pending:
+                group_count[get_contract_group(symb)] += 1
+            for group, count in group_count.items():
+                if not count:
+                    self.set_contract_ready(group)
+
+            # 分块提交到线程池，每块完成后立即推送
+            with ThreadPoolExecutor(max_workers=self.contract_workers) as executor:
+                futures: List[Future] = [
+                    executor.submit(self.load_contracts, pending[i:i + CONTRACT_CHUNK_SIZE])
+                    for i in range(0, len(pending), CONTRACT_CHUNK_SIZE)
+                ]
+                for future in as_completed(futures):
+                    for symb, contract in future.result():
+                        group: Tuple[Exchange, str] = get_contract_group(symb)
+                        group_count[group] -= 1
+                        if not group_count[group]:
+                            self.set_contract_ready(group)
+
+                        if not contract:
+                            continue
+                        contracts[symb] = contract
+                        self.add_contract(symb, contract)
+                        queried += 1
+
+            # 仅在合约有增减时更新缓存
+            removed: int = len(cached) - (len(contracts) - queried)
+            if queried or removed:
+                self.contract_cache.save(trading_day, contracts)
+
+            mode: str = "热启动" if cached else "冷启动"
+            cost: float = perf_counter() - start
+            lazy_count: int = self.resolver.get_symbol_count()
+            memory: str = ""
+            if psutil:
+                memory = f"，内存占用{psutil.Process().memory_info().rss / 1024 / 1024:.1f}MB"
+            self.write_log(
+                f"合约信息查询成功（{mode}），共{len(contracts)}个，"
+                f"缓存加载{len(contracts) - queried}个，新增查询{queried}个，移除{removed}个，"
+                f"延迟加载{lazy_count}个，耗时{cost:.3f}秒{memory}"
+            )
+
             self.contract_inited = True
-            self.write_log("合约信息查询成功")
             for acc in self.api.getaccountlist():
                 data2=self.api.getposition(acc["AccMask"])
-                for data1 in data2:
-                    if data1["Side"]!=0:
-                        symbsplit=data1["Symbol"].split(".")
-                        symbol: str =(symbsplit[2]+"."+self.api.getsymbol_id(data1["Symbol"])) if "TC.F2." not in data1["Symbol"] else (data1["Exchange"]+"."+data1["Symbol"].replace("TC.F2.",""))
-                        contract1: ContractData= symbol_contract_map.get(symbol, None)
-                        # else:
-                        #     contract1 = symbol_contract_map.get(symbsplit[2]+"."+symbol, None)
-                        if contract1:
-                            if data1["SumLongQty"]!=0:
-                                position: PositionData = PositionData(
-                                    symbol=contract1.symbol,
-                                    exchange=contract1.exchange,
-                                    direction=Direction.LONG,
-                                    volume=float(data1["SumLongQty"]),
-                                    price=float(data1["LongOpenPrice"]),
-                                    frozen=float(data1["LongFrozen"]),
-                                    pnl=float(data1["LongFloatProfitByDate"]),
-                                    yd_volume=float(data1["YdLongQty"]),
-                                    gateway_name=self.default_name
-                                )
-                                self.on_position(position)
-                            if data1["SumShortQty"]!=0:
-                                position: PositionData = PositionData(
-                                    symbol=contract1.symbol,
-                                    exchange=contract1.exchange,
-                                    direction=Direction.SHORT,
-                                    volume=float(data1["SumShortQty"]),
-                                    price=float(data1["ShortOpenPrice"]),
-                                    frozen=data1["ShortFrozen"],
-                                    pnl=data1["ShortFloatProfitByDate"],
-                                    yd_volume=data1["YdShortQty"],
-                                    gateway_name=self.default_name
-                                )
-                                self.on_position(position)
-                        else:
-                            self.write_log(f"持仓合约不存在:{data1['Symbol']}")
-                            position: PositionData = PositionData(
-                                symbol=data1["Symbol"],
-                                exchange=Exchange.LOCAL,
-                                direction=DIRECTION_ICE2VT[data1["Side"]],
-                                volume=float(data1["Quantity"]),
-                                price=float(data1["AvgPrice"]),
-                                frozen=data1["LongFrozen"] if data1["Side"]==1 else data1["ShortFrozen"],
-                                pnl=data1["FloatProfitByDate"],
-                                yd_volume=data1["YdLongQty"] if data1["Side"]==1 else data1["YdShortQty"],
-                                gateway_name=self.default_name
-                            )
-                            self.on_position(position)
-                          
+                # 初始持仓全部推送，同时记录为之后增量推送的基准
+                self.eventobj.process_position(acc["AccMask"], data2, True)
+
             orderreport=self.api.getorderreport()
             for orderdata in orderreport:
                 if orderdata["ExecType"]!=10 and orderdata['ExecType']!=12:
-                    symbsplit=orderdata["Symbol"].split(".")
-                    symbol: str =(symbsplit[2]+"."+self.api.getsymbol_id(orderdata["Symbol"])) if "TC.F2." not in orderdata["Symbol"] else (orderdata["Exchange"]+"."+orderdata["Symbol"].replace("TC.F2.",""))
-                    contract: ContractData= symbol_contract_map.get(symbol, None)
+                    contract: ContractData = self.get_contract(orderdata)
+                    if not contract:
+                        continue
 
-                    timestamp: str = f"{orderdata['TransactDate']} {orderdata['TransactTime']}"
-                    dt: datetime = datetime.strptime(timestamp, "%Y%m%d %H%M%S")
-                    dt: datetime = dt.replace(tzinfo=CHINA_TZ)+timedelta(hours=8)
+                    dt: datetime = transact_time_converter.convert(orderdata["TransactDate"], orderdata["TransactTime"])
 
                     tp: tuple = (orderdata["OrderType"], orderdata["TimeInForce"])
 
@@ -447,18 +922,18 @@ class IceTCoreGateway(BaseGateway,BaseDatafeed):
                         reference=orderdata["UserKey1"],
                         gateway_name=self.default_name
                     )
-                    self.on_order(order)
-                    self.eventobj.sysid_orderid_map[orderdata["UserKey1"]] = orderdata["ReportID"]
+                    if self.order_store.update(order):
+                        self.on_order(order)
 
             fillreport=self.api.getfilledreport()
             for filldata in fillreport:
-                symbsplit=filldata["Symbol"].split(".")
-                symbol: str =(symbsplit[2]+"."+self.api.getsymbol_id(filldata["Symbol"])) if "TC.F2." not in filldata["Symbol"] else (filldata["Exchange"]+"."+filldata["Symbol"].replace("TC.F2.",""))
-                contract: ContractData= symbol_contract_map.get(symbol, None)
+                if filldata["OrderID"] in self.early_tradeids:
+                    continue
+                contract: ContractData = self.get_contract(filldata)
+                if not contract:
+                    continue
 
-                timestamp: str = f"{filldata['TransactDate']} {filldata['TransactTime']}"
-                dt: datetime = datetime.strptime(timestamp, "%Y%m%d %H%M%S")
-                dt: datetime = dt.replace(tzinfo=CHINA_TZ)+timedelta(hours=8)
+                dt: datetime = transact_time_converter.convert(filldata["TransactDate"], filldata["TransactTime"])
                 
                 trade: TradeData = TradeData(
                     symbol=contract.symbol,
@@ -473,6 +948,259 @@ class IceTCoreGateway(BaseGateway,BaseDatafeed):
                     gateway_name=self.default_name
                 )
                 self.on_trade(trade)
+class OrderStore:
+    """
+    委托状态存储，按委托编号（ReportID）记录最新委托
+
+    活动委托保存在字典中，进入终态（全部成交、已撤销、拒单）的委托移入有界归档，
+    归档超出容量时淘汰最早结束的委托，长时间运行时内存占用保持稳定。
+    """
+
+    def __init__(self, archive_size: int) -> None:
+        """构造函数"""
+        self.archive_size: int = archive_size
+        self.lock: Lock = Lock()
+
+        self.active_orders: Dict[str, OrderData] = {}
+        self.archived_orders: Dict[str, OrderData] = {}
+        self.references: Dict[str, str] = {}        # 委托引用（UserKey1）：委托编号
+
+        self.suppressed_count: int = 0
+        self.evicted_count: int = 0
+
+    def update(self, order: OrderData, ack: bool = False) -> bool:
+        """
+        更新委托状态，返回是否需要推送（状态、成交量、价格和数量均无变化时不推送）
+
+        ack为True表示下单确认时生成的提交中委托，委托回报可能早于确认到达，此时不回退到提交中状态。
+        """
+        orderid: str = order.orderid
+        with self.lock:
+            last: OrderData = self.active_orders.get(orderid, None) or self.archived_orders.get(orderid, None)
+            if last:
+                if ack or (
+                    last.status == order.status
+                    and last.traded == order.traded
+                    and last.price == order.price
+                    and last.volume == order.volume
+                ):
+                    self.suppressed_count += 1
+                    return False
+
+            if order.reference:
+                self.references[order.reference] = orderid
+
+            if order.is_active():
+                self.active_orders[orderid] = order
+                return True
+
+            self.active_orders.pop(orderid, None)
+            self.archived_orders.pop(orderid, None)
+            self.archived_orders[orderid] = order
+
+            while len(self.archived_orders) > self.archive_size:
+                evicted: OrderData = self.archived_orders.pop(next(iter(self.archived_orders)))
+                if evicted.reference and self.references.get(evicted.reference, None) == evicted.orderid:
+                    self.references.pop(evicted.reference)
+                self.evicted_count += 1
+            return True
+
+    def get(self, orderid: str) -> OrderData:
+        """查询委托"""
+        return self.active_orders.get(orderid, None) or self.archived_orders.get(orderid, None)
+
+    def get_orderid(self, reference: str) -> str:
+        """通过委托引用查询委托编号"""
+        return self.references.get(reference, "")
+
+    def get_statistics(self) -> Dict[str, int]:
+        """查询委托存储统计"""
+        return {
+            "active": len(self.active_orders),
+            "archived": len(self.archived_orders),
+            "suppressed": self.suppressed_count,
+            "evicted": self.evicted_count
+        }
+
+
+class TickConflater:
+    """行情合并推送器，每个合约只保留最新快照，按最大频率推送"""
+
+    def __init__(self, gateway: IceTCoreGateway, interval: float) -> None:
+        """构造函数"""
+        self.gateway: IceTCoreGateway = gateway
+        self.interval: float = interval
+
+        self.slots: Dict[str, TickData] = {}
+        self.last_push: Dict[str, float] = {}
+        self.lock: Lock = Lock()
+        self.event: Event = Event()
+
+        self.received_count: int = 0
+        self.pushed_count: int = 0
+        self.conflated_count: int = 0
+
+        self.active: bool = False
+        self.thread: Thread = Thread(target=self.run, daemon=True)
+
+    def start(self) -> None:
+        """启动推送线程"""
+        self.active = True
+        self.thread.start()
+
+    def stop(self) -> None:
+        """停止推送线程"""
+        if not self.active:
+            return
+        self.active = False
+        self.event.set()
+        self.thread.join()
+
+    def put(self, tick: TickData) -> None:
+        """写入最新行情快照"""
+        with self.lock:
+            self.received_count += 1
+            if tick.vt_symbol in self.slots:
+                self.conflated_count += 1
+            self.slots[tick.vt_symbol] = tick
+        self.event.set()
+
+    def run(self) -> None:
+        """推送线程主循环"""
+        while self.active:
+            self.event.wait(self.interval)
+            self.event.clear()
+
+            # 事件引擎队列已清空时，立即推送全部待处理行情
+            drained: bool = self.gateway.event_engine._queue.empty()
+            now: float = perf_counter()
+            ticks: List[TickData] = []
+            wait: float = self.interval
+
+            with self.lock:
+                for vt_symbol in list(self.slots.keys()):
+                    elapsed: float = now - self.last_push.get(vt_symbol, 0)
+                    if drained or elapsed >= self.interval:
+                        ticks.append(self.slots.pop(vt_symbol))
+                        self.last_push[vt_symbol] = now
+                    else:
+                        wait = min(wait, self.interval - elapsed)
+
+            for tick in ticks:
+                self.gateway.on_tick(tick)
+            self.pushed_count += len(ticks)
+
+            # 仍有合约未到推送时间，等待到最早的推送时点
+            if len(ticks) == 0 and self.slots:
+                sleep(wait)
+
+    def get_statistics(self) -> Dict[str, int]:
+        """查询合并统计"""
+        return {
+            "received": self.received_count,
+            "pushed": self.pushed_count,
+            "conflated": self.conflated_count
+        }
+
+
+class ContractResolver:
+    """
+    合约按需解析器，只查询被请求的合约
+
+    候选ICE代码由接口登记（被过滤的延迟加载合约），或在首次未命中时通过getallsymbol获取；
+    已解析的合约优先从本地合约缓存快照中读取。
+    """
+
+    def __init__(self, gateway_name: str, use_snapshot: bool = True) -> None:
+        """构造函数，use_snapshot为False时不读取合约缓存快照，也不主动获取全市场代码"""
+        self.gateway_name: str = gateway_name
+        self.use_snapshot: bool = use_snapshot
+        self.api: TCoreAPI = None
+        self.lock: Lock = Lock()
+
+        self.symbols: Dict[str, Set[str]] = {}                      # 交易所: 未加载的ICE代码
+        self.symbol_ids: Dict[str, str] = {}                        # ICE代码: 合约代码
+        self.contracts: Dict[str, Tuple[str, ContractData]] = {}    # 合约键: (ICE代码, 合约)
+        self.universe_loaded: bool = not use_snapshot
+        self.snapshot_loaded: bool = not use_snapshot
+
+    def add_symbol(self, symb: str) -> None:
+        """登记待按需加载的ICE代码"""
+        with self.lock:
+            self.symbols.setdefault(symb.split(".")[2], set()).add(symb)
+
+    def get_symbol_count(self) -> int:
+        """查询尚未加载的ICE代码数量"""
+        return sum(len(symbols) for symbols in self.symbols.values())
+
+    def load_snapshot(self) -> None:
+        """读取最近一个交易日的合约缓存快照"""
+        self.snapshot_loaded = True
+        for symb, contract in ContractCache().load_latest().items():
+            self.contracts[symb.split(".")[2]+"."+contract.symbol] = (symb, contract)
+
+    def load_universe(self) -> None:
+        """通过getallsymbol获取全市场ICE代码作为候选"""
+        self.universe_loaded = True
+        loaded: Set[str] = {symb for symb, _ in self.contracts.values()}
+        for symb in self.api.getallsymbol() or []:
+            if len(symb.split(".")) >= 4 and symb not in loaded:
+                self.symbols.setdefault(symb.split(".")[2], set()).add(symb)
+
+    def resolve(self, key: str, ice_symbol: str = "") -> Tuple[str, ContractData]:
+        """通过合约键（ICE交易所.合约代码）解析合约，ICE代码未知时在同交易所候选代码中查找"""
+        exchange, _, symbol = key.partition(".")
+        with self.lock:
+            if not self.snapshot_loaded:
+                self.load_snapshot()
+
+            result: Tuple[str, ContractData] = self.contracts.get(key, None)
+            if result:
+                return result
+
+            if not self.universe_loaded and self.api:
+                self.load_universe()
+
+            symbols: Set[str] = self.symbols.get(exchange, None)
+            if not symbols:
+                return ice_symbol, None
+
+            if ice_symbol not in symbols:
+                ice_symbol = self.find_symbol(symbol, symbols)
+
+            if not ice_symbol:
+                return ice_symbol, None
+
+            contract: ContractData = load_contract(self.api, ice_symbol, self.gateway_name)
+            symbols.discard(ice_symbol)
+            self.symbol_ids.pop(ice_symbol, None)
+            if contract:
+                self.contracts[key] = (ice_symbol, contract)
+            return ice_symbol, contract
+
+
+    def find_symbol(self, symbol: str, symbols: Set[str]) -> str:
+        """在同交易所候选代码中查找合约代码对应的ICE代码，未找到返回空字符串"""
+        if "TC.F2."+symbol in symbols:
+            return "TC.F2."+symbol
+
+        # 只查询品种代码为合约代码前缀的候选，数字代码的ETF期权（如10000123）与品种代码无关，再查期权代码
+        lower_symbol: str = symbol.lower()
+        candidates: List[str] = [symb for symb in symbols if lower_symbol.startswith(symb.split(".")[3].lower())]
+        if symbol.isdigit():
+            candidates.extend(symb for symb in symbols if symb.startswith("TC.O.") and symb not in candidates)
+
+        # 到期月份和行权价也出现在合约代码中的候选优先查询
+        candidates.sort(key=lambda symb: -get_symbol_score(symb, symbol))
+
+        for symb in candidates:
+            if symb not in self.symbol_ids:
+                self.symbol_ids[symb] = self.api.getsymbol_id(symb)
+            if self.symbol_ids[symb] == symbol:
+                return symb
+        return ""
+
+
 class IceTCoreAPI(TradeEvent,QuoteEvent):
     """"""
     def __init__(self, gateway: IceTCoreGateway) -> None:
@@ -481,11 +1209,25 @@ class IceTCoreAPI(TradeEvent,QuoteEvent):
         self.gateway: IceTCoreGateway = gateway
         self.gateway_name: str = gateway.gateway_name
         self.default_name: str = "ICETCore"
-        self.sysid_orderid_map: Dict[str, str] = {}
+        self.tick_templates: Dict[str, dict] = {}
+
+        # 持仓和资金的最近推送状态，只推送有变化的记录，可设置定时全量推送
+        self.position_states: Dict[tuple, tuple] = {}
+        self.account_states: Dict[str, tuple] = {}
+        self.position_suppressed: int = 0
+        self.account_suppressed: int = 0
+        self.snapshot_interval: float = 0
+        self.snapshot_times: Dict[str, float] = {}
+
         self.current_date: str = datetime.now().strftime("%Y%m%d")
 
+        # 接口关闭后连接可能仍被数据服务引用，此时不再处理推送
+        self.active: bool = False
+
     def onconnected(self,apitype:str) -> None:
         """服务器连接成功回报"""
+        if not self.active:
+            return
         if "quote"==apitype:
             self.login_status = True
             self.gateway.write_log("行情接口连线成功")
@@ -498,6 +1240,8 @@ class IceTCoreAPI(TradeEvent,QuoteEvent):
 
     def ondisconnected(self,apitype:str) -> None:
         """服务器连接断开回报"""
+        if not self.active:
+            return
         if "quote" in apitype:
             self.login_status = False
             self.gateway.write_log("行情接口连接断开")
@@ -517,56 +1261,60 @@ class IceTCoreAPI(TradeEvent,QuoteEvent):
         # if not data["DateTime"]:
         #     return
         # # 过滤还没有收到合约数据前的行情推送
-        symbsplit=data["Symbol"].split(".")
-        symbol: str =(symbsplit[2]+"."+self.gateway.api.getsymbol_id(data["Symbol"])) if "TC.F2." not in data["Symbol"] else (data["Exchange"]+"."+data["Symbol"].replace("TC.F2.",""))
-        contract: ContractData= symbol_contract_map.get(symbol, None)
+        if not self.active:
+            return
+        recorder: LatencyRecorder = self.gateway.latency_recorder
+        if recorder:
+            start: float = perf_counter()
+
+        contract: ContractData = self.gateway.get_contract(data)
 
         if not contract:
             return
-        tick: TickData = TickData(
-            symbol=contract.symbol,
-            exchange=contract.exchange,
-            datetime=data["DateTime"].replace(tzinfo=CHINA_TZ),
-            #name=contract.name,
-            volume=data["Volume"]if data["Volume"] else 0,
-            turnover=data["Turnover"] if data["Turnover"] else 0,
-            open_interest=data["OpenInterest"] if "OpenInterest" in data.keys() else 0,
-            last_price=adjust_price(data["Last"]) if adjust_price(data["Last"]) else 0,
-            limit_up=data["UpperLimit"] if data["UpperLimit"] else 0,
-            limit_down=data["LowerLimit"] if data["LowerLimit"] else 0,
-            open_price=adjust_price(data["Open"]) if adjust_price(data["Open"]) else 0,
-            high_price=adjust_price(data["High"]) if adjust_price(data["High"]) else 0,
-            low_price=adjust_price(data["Low"]) if adjust_price(data["Low"]) else 0,
-            pre_close=adjust_price(data["YClosedPrice"]) if adjust_price(data["YClosedPrice"]) else 0,
-            bid_price_1=adjust_price(data["Bid"]) if adjust_price(data["Bid"]) else 0,
-            ask_price_1=adjust_price(data["Ask"]) if adjust_price(data["Ask"]) else 0,
-            bid_volume_1=data["BidVolume"] if data["BidVolume"] else 0,
-            ask_volume_1=data["AskVolume"] if data["AskVolume"] else 0,
-            gateway_name=self.gateway_name
-        )
+
+        # 基于合约的Tick模板复制字段，跳过数据类构造函数的逐个参数匹配
+        template: dict = self.tick_templates.get(contract.vt_symbol, None)
+        if not template:
+            template = TickData(
+                symbol=contract.symbol,
+                exchange=contract.exchange,
+                datetime=None,
+                gateway_name=self.gateway_name
+            ).__dict__
+            self.tick_templates[contract.vt_symbol] = template
+
+        fields: dict = template.copy()
+        fields["datetime"] = data["DateTime"].replace(tzinfo=CHINA_TZ)
+        fields["open_interest"] = data.get("OpenInterest", 0) or 0
+        for name, key in TICK_VALUE_FIELDS:
+            fields[name] = data[key] or 0
+        for name, key in TICK_PRICE_FIELDS:
+            price: float = data[key]
+            fields[name] = price if price and price != MAX_FLOAT else 0
 
         if data["BidVolume1"] or data["AskVolume1"]:
-            tick.bid_price_2 = adjust_price(data["Bid1"])
-            tick.bid_price_3 = adjust_price(data["Bid2"])
-            tick.bid_price_4 = adjust_price(data["Bid3"])
-            tick.bid_price_5 = adjust_price(data["Bid4"])
+            for name, key in TICK_DEPTH_PRICE_FIELDS:
+                price: float = data[key]
+                fields[name] = price if price and price != MAX_FLOAT else 0
+            for name, key in TICK_DEPTH_VOLUME_FIELDS:
+                fields[name] = data[key] or 0
 
-            tick.ask_price_2 = adjust_price(data["Ask1"])
-            tick.ask_price_3 = adjust_price(data["Ask2"])
-            tick.ask_price_4 = adjust_price(data["Ask3"])
-            tick.ask_price_5 = adjust_price(data["Ask4"])
+        tick: TickData = TickData.__new__(TickData)
+        tick.__dict__ = fields
 
-            tick.bid_volume_2 = data["BidVolume1"]
-            tick.bid_volume_3 = data["BidVolume2"]
-            tick.bid_volume_4 = data["BidVolume3"]
-            tick.bid_volume_5 = data["BidVolume4"]
+        if recorder:
+            converted: float = perf_counter()
+            recorder.record("quote.convert", converted - start)
+            recorder.record("quote.exchange", time() - tick.datetime.timestamp())
 
-            tick.ask_volume_2 = data["AskVolume1"]
-            tick.ask_volume_3 = data["AskVolume2"]
-            tick.ask_volume_4 = data["AskVolume3"]
-            tick.ask_volume_5 = data["AskVolume4"]
+        conflater: TickConflater = self.gateway.tick_conflater
+        if conflater:
+            conflater.put(tick)
+        else:
+            self.gateway.on_tick(tick)
 
-        self.gateway.on_tick(tick)
+        if recorder:
+            recorder.record("quote.dispatch", perf_counter() - converted)
 
     # def onATM(self,datatype,symbol,data:dict):
     #     pass
@@ -578,7 +1326,22 @@ class IceTCoreAPI(TradeEvent,QuoteEvent):
             self.gateway.brokerid=data[0]["BrokerID"]
     def onordereportreal(self,data):
         """委托更新推送"""
-        if not self.gateway.contract_inited:
+        if not self.active:
+            return
+        recorder: LatencyRecorder = self.gateway.latency_recorder
+        if recorder:
+            start: float = perf_counter()
+
+        # 唤醒等待委托确认的下单线程
+        with self.gateway.order_condition:
+            self.gateway.order_report_count += 1
+            self.gateway.order_condition.notify_all()
+
+        # 按合约判断是否可处理，已加载完成的品种在期权链加载期间也能收到回报
+        contract: ContractData = self.gateway.get_contract(data)
+        if not contract:
+            if self.gateway.contract_inited:
+                self.gateway.write_log(f"委托合约不存在:{data['Symbol']}，委托编号：{data['ReportID']}")
             return
         # if data["ExecType"]==10:
         #     self.gateway.write_error("交易委托失败",data["ReportID"])
@@ -586,19 +1349,14 @@ class IceTCoreAPI(TradeEvent,QuoteEvent):
         # elif data['ExecType']==12:
         #     self.gateway.write_log("删改单失败："+data["ReportID"])
         #     return
-        symbsplit=data["Symbol"].split(".")
-        symbol: str =(symbsplit[2]+"."+self.gateway.api.getsymbol_id(data["Symbol"])) if "TC.F2." not in data["Symbol"] else (data["Exchange"]+"."+data["Symbol"].replace("TC.F2.",""))
-        contract: ContractData= symbol_contract_map.get(symbol, None)
-        timestamp: str = f"{data['TransactDate']} {data['TransactTime']}"
-        dt: datetime = datetime.strptime(timestamp, "%Y%m%d %H%M%S")
-        dt: datetime = dt.replace(tzinfo=CHINA_TZ)+timedelta(hours=8)
+        dt: datetime = transact_time_converter.convert(data["TransactDate"], data["TransactTime"])
 
         tp: tuple = (data["OrderType"], data["TimeInForce"])
 
         order: OrderData = OrderData(
             symbol=contract.symbol,
             exchange=contract.exchange,
-            orderid=data["ReportID"],
+            orderid=self.gateway.get_report_orderid(data["ReportID"]),
             type=ORDERTYPE_ICE2VT[tp] if tp in ORDERTYPE_ICE2VT.keys() else OrderType.LIMIT,
             direction=DIRECTION_ICE2VT[data["Side"]],
             offset=OFFSET_ICE2VT[data["PositionEffect"]] if data["PositionEffect"] in OFFSET_ICE2VT.keys() else Offset.NONE,
@@ -610,27 +1368,33 @@ class IceTCoreAPI(TradeEvent,QuoteEvent):
             reference=data["UserKey1"],
             gateway_name=self.gateway_name
         )
-        self.gateway.on_order(order)
+        if self.gateway.order_store.update(order):
+            self.gateway.on_order(order)
+
+        if recorder:
+            recorder.record("order.report", perf_counter() - start)
 
-        self.sysid_orderid_map[data["UserKey1"]] = data["ReportID"]
     def onfilledreportreal(self,data):
         """成交数据推送"""
-        if not self.gateway.contract_inited:
+        if not self.active:
             return
-        symbsplit=data["Symbol"].split(".")
-        symbol: str =(symbsplit[2]+"."+self.gateway.api.getsymbol_id(data["Symbol"])) if "TC.F2." not in data["Symbol"] else (data["Exchange"]+"."+data["Symbol"].replace("TC.F2.",""))
-        contract: ContractData= symbol_contract_map.get(symbol, None)
+        recorder: LatencyRecorder = self.gateway.latency_recorder
+        if recorder:
+            start: float = perf_counter()
+            self.gateway.record_fill_time(data["DetailReportID"], start)
 
-        orderid: str = self.sysid_orderid_map[data["UserKey1"]]
+        contract: ContractData = self.gateway.get_contract(data)
+        if not contract:
+            if self.gateway.contract_inited:
+                self.gateway.write_log(f"成交合约不存在:{data['Symbol']}，成交编号：{data['OrderID']}")
+            return
 
-        timestamp: str = f"{data['TransactDate']} {data['TransactTime']}"
-        dt: datetime = datetime.strptime(timestamp, "%Y%m%d %H%M%S")
-        dt: datetime = dt.replace(tzinfo=CHINA_TZ)+timedelta(hours=8)
+        dt: datetime = transact_time_converter.convert(data["TransactDate"], data["TransactTime"])
         
         trade: TradeData = TradeData(
             symbol=contract.symbol,
             exchange=contract.exchange,
-            orderid=data["DetailReportID"],
+            orderid=self.gateway.get_report_orderid(data["DetailReportID"]),
             tradeid=data["OrderID"],
             direction=DIRECTION_ICE2VT[data["Side"]],
             offset=OFFSET_ICE2VT[data["PositionEffect"]] if data["PositionEffect"] in OFFSET_ICE2VT.keys() else Offset.NONE,
@@ -639,7 +1403,13 @@ class IceTCoreAPI(TradeEvent,QuoteEvent):
             datetime=dt,
             gateway_name=self.gateway_name
         )
+        # 合约加载期间推送的成交，加载完成后的当日成交回放中不再重复推送
+        if not self.gateway.trade_replayed:
+            self.gateway.early_tradeids.add(trade.tradeid)
         self.gateway.on_trade(trade)
+
+        if recorder:
+            recorder.record("trade.report", perf_counter() - start)
     # def onorderreportreset(self):
     #     self.positions.clear()
     # def onpositionmoniter(self,data):
@@ -648,9 +1418,20 @@ class IceTCoreAPI(TradeEvent,QuoteEvent):
         """资金查询回报"""
         # if "Account" not in data[0].keys():
         #     return
+        if not self.active:
+            return
+        full: bool = self.check_snapshot(f"account.{accmask}")
         for data1 in data:
             if "Account" not in data1.keys():
                 return
+
+            # 资金无变化时不重复推送
+            state: tuple = (data1["TotalEquity"], data1["FrozenCash"], data1["ExcessEquity"])
+            if not full and self.account_states.get(data1["Account"], None) == state:
+                self.account_suppressed += 1
+                continue
+            self.account_states[data1["Account"]] = state
+
             account: AccountData = AccountData(
                 accountid=data1["Account"],
                 balance=float(data1["TotalEquity"]),
@@ -661,57 +1442,215 @@ class IceTCoreAPI(TradeEvent,QuoteEvent):
             self.gateway.on_account(account)
 
     def onposition(self,accmask,data):
-        if not data:
-            return
-        if not self.gateway.contract_inited:
+        if not data or not self.active:
             return
+        self.process_position(accmask, data, self.check_snapshot(f"position.{accmask}"))
+
+    def process_position(self, accmask: str, data: list, full: bool) -> None:
+        """处理持仓数据，full为False时只推送有变化的持仓"""
         for data1 in data:
             if data1["Side"]!=0:
-                symbsplit=data1["Symbol"].split(".")
-                symbol: str =(symbsplit[2]+"."+self.gateway.api.getsymbol_id(data1["Symbol"])) if "TC.F2." not in data1["Symbol"] else (data1["Exchange"]+"."+data1["Symbol"].replace("TC.F2.",""))
-                contract: ContractData= symbol_contract_map.get(symbol, None)
+                accountid: str = data1.get("Account", accmask)
+                contract: ContractData = self.gateway.get_contract(data1)
                 if contract:
-                    if data1["SumLongQty"]!=0:
-                        position: PositionData = PositionData(
-                            symbol=contract.symbol,
-                            exchange=contract.exchange,
-                            direction=Direction.LONG,
-                            volume=float(data1["SumLongQty"]),
-                            price=float(data1["LongOpenPrice"]),
-                            frozen=float(data1["LongFrozen"]),
-                            pnl=float(data1["LongFloatProfitByDate"]),
-                            yd_volume=float(data1["YdLongQty"]),
-                            gateway_name=self.default_name
+                    key: tuple = (accountid, contract.vt_symbol, Direction.LONG)
+                    if data1["SumLongQty"]!=0 or key in self.position_states:
+                        state: tuple = (
+                            data1["SumLongQty"],
+                            data1["LongOpenPrice"],
+                            data1["LongFrozen"],
+                            data1["LongFloatProfitByDate"],
+                            data1["YdLongQty"]
                         )
-                        self.gateway.on_position(position)
-                    if data1["SumShortQty"]!=0:
-                        position: PositionData = PositionData(
-                            symbol=contract.symbol,
-                            exchange=contract.exchange,
-                            direction=Direction.SHORT,
-                            volume=float(data1["SumShortQty"]),
-                            price=float(data1["ShortOpenPrice"]),
-                            frozen=data1["ShortFrozen"],
-                            pnl=data1["ShortFloatProfitByDate"],
-                            yd_volume=data1["YdShortQty"],
-                            gateway_name=self.default_name
+                        if self.update_position_state(key, state, full):
+                            position: PositionData = PositionData(
+                                symbol=contract.symbol,
+                                exchange=contract.exchange,
+                                direction=Direction.LONG,
+                                volume=float(data1["SumLongQty"]),
+                                price=float(data1["LongOpenPrice"]),
+                                frozen=float(data1["LongFrozen"]),
+                                pnl=float(data1["LongFloatProfitByDate"]),
+                                yd_volume=float(data1["YdLongQty"]),
+                                gateway_name=self.default_name
+                            )
+                            self.gateway.on_position(position)
+
+                    key: tuple = (accountid, contract.vt_symbol, Direction.SHORT)
+                    if data1["SumShortQty"]!=0 or key in self.position_states:
+                        state: tuple = (
+                            data1["SumShortQty"],
+                            data1["ShortOpenPrice"],
+                            data1["ShortFrozen"],
+                            data1["ShortFloatProfitByDate"],
+                            data1["YdShortQty"]
                         )
-                        self.gateway.on_position(position)
-                else:
+                        if self.update_position_state(key, state, full):
+                            position: PositionData = PositionData(
+                                symbol=contract.symbol,
+                                exchange=contract.exchange,
+                                direction=Direction.SHORT,
+                                volume=float(data1["SumShortQty"]),
+                                price=float(data1["ShortOpenPrice"]),
+                                frozen=data1["ShortFrozen"],
+                                pnl=data1["ShortFloatProfitByDate"],
+                                yd_volume=data1["YdShortQty"],
+                                gateway_name=self.default_name
+                            )
+                            self.gateway.on_position(position)
+                elif self.gateway.contract_inited:
+                    # 合约加载期间尚未就绪的持仓，等加载完成后的全量推送
+                    direction: Direction = DIRECTION_ICE2VT[data1["Side"]]
+                    key: tuple = (accountid, data1["Symbol"], direction)
+                    state: tuple = (
+                        data1["Quantity"],
+                        data1["AvgPrice"],
+                        data1["LongFrozen"] if data1["Side"]==1 else data1["ShortFrozen"],
+                        data1["FloatProfitByDate"],
+                        data1["YdLongQty"] if data1["Side"]==1 else data1["YdShortQty"]
+                    )
+                    if not self.update_position_state(key, state, full):
+                        continue
+
                     self.gateway.write_log(f"持仓合约不存在:{data1['Symbol']}")
                     position: PositionData = PositionData(
                         symbol=data1["Symbol"],
                         exchange=Exchange.LOCAL,
-                        direction=DIRECTION_ICE2VT[data1["Side"]],
+                        direction=direction,
                         volume=float(data1["Quantity"]),
                         price=float(data1["AvgPrice"]),
-                        frozen=data1["LongFrozen"] if data1["Side"]==1 else data1["ShortFrozen"],
+                        frozen=state[2],
                         pnl=data1["FloatProfitByDate"],
-                        yd_volume=data1["YdLongQty"] if data1["Side"]==1 else data1["YdShortQty"],
+                        yd_volume=state[4],
                         gateway_name=self.gateway_name
                     )
                     self.gateway.on_position(position)
 
+    def update_position_state(self, key: tuple, state: tuple, full: bool) -> bool:
+        """更新持仓状态，返回是否需要推送，持仓量归零的记录推送后不再保留"""
+        if not full and self.position_states.get(key, None) == state:
+            self.position_suppressed += 1
+            return False
+
+        if state[0]:
+            self.position_states[key] = state
+        else:
+            self.position_states.pop(key, None)
+        return True
+
+    def check_snapshot(self, name: str) -> bool:
+        """检查是否到达全量推送时间，name包含账户（AccMask），各账户分别计时"""
+        if not self.snapshot_interval:
+            return False
+
+        now: float = perf_counter()
+        if now - self.snapshot_times.get(name, 0) < self.snapshot_interval:
+            return False
+        self.snapshot_times[name] = now
+        return True
+
+
+def trim_times(times: Dict[str, float]) -> None:
+    """按记录顺序淘汰最早的记录，保持内存占用固定"""
+    while len(times) > ORDER_ARCHIVE_SIZE:
+        times.pop(next(iter(times)))
+
+
+def get_symbol_score(symb: str, symbol: str) -> int:
+    """计算ICE代码的到期月份（YMM）和行权价在合约代码中出现的个数"""
+    symbcheck: List[str] = symb.split(".")
+    score: int = 0
+    if len(symbcheck) > 4 and symbcheck[4][3:] and symbcheck[4][3:] in symbol:
+        score += 1
+    if len(symbcheck) > 6 and ".".join(symbcheck[6:]) in symbol:
+        score += 1
+    return score
+
+
+def split_setting(value: str) -> List[str]:
+    """拆分逗号分隔的配置项"""
+    return [item.strip() for item in str(value).replace("，", ",").split(",") if item.strip()]
+
+
+def get_contract_group(symb: str) -> Tuple[Exchange, str]:
+    """获取ICE代码所属的交易所和代码类型分组"""
+    symbcheck: List[str] = symb.split(".")
+    if len(symbcheck) < 4:
+        return (Exchange.LOCAL, "")
+    return (EXCHANGE_ICE2VT.get(symbcheck[2], Exchange.LOCAL), symbcheck[1])
+
+
+def load_contract(api: TCoreAPI, symb: str, gateway_name: str) -> ContractData:
+    """通过SDK查询合约信息，代码格式不符时返回None"""
+    symbcheck=symb.split(".")
+    if len(symbcheck)<4:
+        return None
+
+    product: Product = product_classifier.classify(symb)
+    symbol_id=api.getsymbol_id(symb)
+    volume_multiple=api.getsymbolvolume_multiple(symb)
+    symbol_ticksize=api.getsymbol_ticksize(symb)
+    contract: ContractData = ContractData(
+        symbol=symbol_id if "TC.F2." not in symb else symb.replace("TC.F2.",""),
+        exchange=EXCHANGE_ICE2VT[symbcheck[2]] if symbcheck[2] in EXCHANGE_ICE2VT.keys() else Exchange.LOCAL,
+        name=symb.replace(symbcheck[0]+"."+symbcheck[1]+".","") if "TC.F2." not in symb else symb.replace("TC.F2.",""),
+        product=product,
+        size=float(volume_multiple) if volume_multiple else 0.001,
+        pricetick=float(symbol_ticksize) if symbol_ticksize else 1000,
+        gateway_name=gateway_name
+    )
+    underlymap={"IO":"IF","HO":"IH","MO":"IM"}
+
+    # 期权相关
+    if contract.product == Product.OPTION:
+        underlying=""
+        if ".CFFEX." in symb:
+            underlying=underlymap[symbcheck[3]]+symbcheck[4]
+        else:
+            underlying=symbcheck[3]+symbcheck[4]
+        portfolio=""
+        if ".CFFEX." in symb or "CZCE" in symb:
+            portfolio=symbcheck[3]
+        elif "SSE" in symb or "SZSE" in symb:
+            portfolio=symbcheck[3]+"_O"
+        else:
+            portfolio=symbcheck[3]+"_o"
+
+        strick=symb.replace(symbcheck[0]+"."+symbcheck[1]+"."+symbcheck[2]+"."+symbcheck[3]+"."+symbcheck[4]+"."+symbcheck[5]+".","")
+        contract.option_portfolio =portfolio
+        contract.option_underlying =underlying
+        contract.option_type = OPTIONTYPE_ICE2VT.get(symbcheck[5], None)
+        contract.option_strike = float(strick)
+        contract.option_index = strick
+        contract.option_expiry = datetime.strptime(api.getexpirationdate(symb), "%Y%m%d")
+    return contract
+
+
+class TransactTimeConverter:
+    """
+    委托成交回报时间转换器
+
+    回报时间为UTC时间，日期部分按交易日解析一次并缓存（已加上时区偏移），时间部分按HHMMSS整数计算。
+    """
+
+    def __init__(self, offset: timedelta = timedelta(hours=8)) -> None:
+        """构造函数"""
+        self.offset: timedelta = offset
+        self.dates: Dict[str, datetime] = {}
+
+    def convert(self, transact_date: str, transact_time: str) -> datetime:
+        """将回报的TransactDate和TransactTime转换为北京时间"""
+        base: datetime = self.dates.get(transact_date, None)
+        if base is None:
+            base = datetime.strptime(str(transact_date), "%Y%m%d").replace(tzinfo=CHINA_TZ) + self.offset
+            self.dates[transact_date] = base
+
+        t: int = int(transact_time)
+        return base + timedelta(seconds=t // 10000 * 3600 + t // 100 % 100 * 60 + t % 100)
+
+
+transact_time_converter: TransactTimeConverter = TransactTimeConverter()
+
 
 def adjust_price(price: float) -> float:
     """将异常的浮点数最大值（MAX_FLOAT）数据调整为0"""
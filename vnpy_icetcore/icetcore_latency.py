@@ -0,0 +1,99 @@
+from math import frexp
+from threading import Lock
+from typing import Dict, List
+
+
+# 直方图分桶设置：每个2倍区间分为4个子桶，覆盖1微秒到约67秒
+SUB_BUCKETS: int = 4
+MAX_EXPONENT: int = 27
+BUCKET_COUNT: int = 1 + MAX_EXPONENT * SUB_BUCKETS
+
+# 快照中输出的百分位
+PERCENTILES: List[float] = [50, 90, 99, 99.9]
+
+
+class LatencyHistogram:
+    """固定内存的对数分桶延时直方图，单位为微秒"""
+
+    def __init__(self) -> None:
+        """构造函数"""
+        self.buckets: List[int] = [0] * BUCKET_COUNT
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+
+    def add(self, us: float) -> None:
+        """记录一次延时"""
+        self.count += 1
+        self.total += us
+        if us > self.max:
+            self.max = us
+
+        if us < 1:
+            self.buckets[0] += 1
+            return
+
+        mantissa, exponent = frexp(us)
+        index: int = 1 + (exponent - 1) * SUB_BUCKETS + int((mantissa * 2 - 1) * SUB_BUCKETS)
+        self.buckets[min(index, BUCKET_COUNT - 1)] += 1
+
+    def get_percentile(self, percentile: float) -> float:
+        """按分桶上界估算百分位延时"""
+        if not self.count:
+            return 0
+
+        target: float = self.count * percentile / 100
+        cumulative: int = 0
+        for index, count in enumerate(self.buckets):
+            cumulative += count
+            if cumulative >= target:
+                return min(get_bucket_bound(index), self.max)
+        return self.max
+
+
+class LatencyRecorder:
+    """按事件类型统计延时的记录器"""
+
+    def __init__(self) -> None:
+        """构造函数"""
+        self.lock: Lock = Lock()
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        """记录事件延时，负值（如时钟偏差）按0计"""
+        us: float = seconds * 1_000_000 if seconds > 0 else 0
+        with self.lock:
+            histogram: LatencyHistogram = self.histograms.get(name, None)
+            if not histogram:
+                histogram = LatencyHistogram()
+                self.histograms[name] = histogram
+            histogram.add(us)
+
+    def get_snapshot(self) -> Dict[str, Dict[str, float]]:
+        """查询各事件类型的延时分布，单位为毫秒"""
+        snapshot: Dict[str, Dict[str, float]] = {}
+        with self.lock:
+            for name, histogram in self.histograms.items():
+                data: Dict[str, float] = {
+                    "count": histogram.count,
+                    "avg": histogram.total / histogram.count / 1000 if histogram.count else 0,
+                    "max": histogram.max / 1000
+                }
+                for percentile in PERCENTILES:
+                    data[f"p{percentile:g}"] = histogram.get_percentile(percentile) / 1000
+                snapshot[name] = data
+        return snapshot
+
+    def reset(self) -> None:
+        """清空统计"""
+        with self.lock:
+            self.histograms.clear()
+
+
+def get_bucket_bound(index: int) -> float:
+    """获取分桶的上界（微秒）"""
+    if not index:
+        return 1
+
+    exponent, sub = divmod(index - 1, SUB_BUCKETS)
+    return 2 ** exponent * (1 + (sub + 1) / SUB_BUCKETS)
@@ -0,0 +1,97 @@
+from typing import Dict, List, Tuple
+
+from vnpy.trader.constant import Product
+
+
+# 证券代码前缀规则（交易所, 代码前缀, 产品类型）
+STOCK_PRODUCT_RULES: List[Tuple[str, str, Product]] = [
+    ("SSE", "60", Product.EQUITY),
+    ("SSE", "90", Product.EQUITY),
+    ("SZSE", "00", Product.EQUITY),
+    ("SZSE", "30", Product.EQUITY),
+    ("SZSE", "20", Product.EQUITY),
+    ("SSE", "000", Product.INDEX),
+    ("SZSE", "399", Product.INDEX),
+    ("SSE", "51", Product.ETF),
+    ("SZSE", "15", Product.ETF),
+    ("SSE", "01", Product.BOND),
+    ("SSE", "11", Product.BOND),
+    ("SSE", "20", Product.BOND),
+    ("SZSE", "10", Product.BOND),
+    ("SZSE", "12", Product.BOND),
+    ("SZSE", "13", Product.BOND),
+    ("SSE", "50", Product.FUND),
+    ("SZSE", "16", Product.FUND),
+]
+
+# 代码类型映射（ICE代码第二段：产品类型）
+SYMBOLTYPE_PRODUCT_MAP: Dict[str, Product] = {
+    "F": Product.FUTURES,
+    "O": Product.OPTION,
+    "F2": Product.SPREAD
+}
+
+# 产品类型对应的ICE代码头
+PRODUCT_SYMBOLHEAD_MAP: Dict[Product, str] = {
+    Product.FUTURES: "TC.F.",
+    Product.OPTION: "TC.O.",
+    Product.SPREAD: "TC.F2."
+}
+
+
+class ProductClassifier:
+    """基于交易所和代码前缀映射的产品类型分类器"""
+
+    def __init__(
+        self,
+        rules: List[Tuple[str, str, Product]] = STOCK_PRODUCT_RULES,
+        default: Product = Product.FUTURES
+    ) -> None:
+        """构造函数"""
+        self.default: Product = default
+        self.prefixes: Dict[str, Dict[str, Product]] = {}
+        self.lengths: Dict[str, List[int]] = {}
+
+        for exchange, prefix, product in rules:
+            self.add_rule(exchange, prefix, product)
+
+    def add_rule(self, exchange: str, prefix: str, product: Product) -> None:
+        """添加证券代码前缀规则，已存在的前缀会被覆盖"""
+        self.prefixes.setdefault(exchange, {})[prefix] = product
+
+        # 前缀长度从长到短排列，保证最长前缀优先匹配
+        lengths: List[int] = self.lengths.setdefault(exchange, [])
+        if len(prefix) not in lengths:
+            lengths.append(len(prefix))
+            lengths.sort(reverse=True)
+
+    def classify_code(self, exchange: str, code: str) -> Product:
+        """按最长前缀匹配证券代码的产品类型"""
+        prefixes: Dict[str, Product] = self.prefixes.get(exchange, None)
+        if not prefixes:
+            return self.default
+
+        for length in self.lengths[exchange]:
+            product: Product = prefixes.get(code[:length], None)
+            if product is not None:
+                return product
+        return self.default
+
+    def classify(self, symb: str) -> Product:
+        """获取ICE代码的产品类型"""
+        symbcheck: List[str] = symb.split(".", 4)
+        if len(symbcheck) < 4:
+            return self.default
+
+        product: Product = SYMBOLTYPE_PRODUCT_MAP.get(symbcheck[1], None)
+        if product is not None:
+            return product
+        return self.classify_code(symbcheck[2], symbcheck[3])
+
+
+def get_symbol_head(product: Product) -> str:
+    """获取产品类型对应的ICE代码头"""
+    return PRODUCT_SYMBOLHEAD_MAP.get(product, "TC.S.")
+
+
+product_classifier: ProductClassifier = ProductClassifier()
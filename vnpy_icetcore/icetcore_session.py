@@ -0,0 +1,160 @@
+from time import perf_counter
+from threading import Lock, Semaphore
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from icetcore import TCoreAPI
+
+from vnpy.trader.setting import SETTINGS
+
+
+class Session:
+    """共享的TCoreAPI连接"""
+
+    def __init__(self, api: TCoreAPI, apppath: str, eventclass: object, max_requests: int) -> None:
+        """构造函数"""
+        self.api: TCoreAPI = api
+        self.apppath: str = apppath
+        self.eventclass: object = eventclass
+        self.ref_count: int = 0
+
+        # 历史数据请求并发控制与统计
+        self.max_requests: int = max_requests
+        self.semaphore: Semaphore = Semaphore(max_requests)
+        self.lock: Lock = Lock()
+        self.create_time: float = perf_counter()
+        self.request_count: int = 0
+        self.active_count: int = 0
+        self.active_max: int = 0
+        self.wait_count: int = 0
+        self.busy_time: float = 0
+
+
+class SessionManager:
+    """
+    进程内共享的TCoreAPI连接管理器
+
+    同一客户端路径的接口和数据服务共用一个连接，按引用计数在最后一个使用者释放时断开。
+    交易接口需要事件回调，若已有连接不带回调则为其新建连接，之后的历史数据请求优先使用该连接。
+    带事件回调的交易连接上，历史数据请求默认串行执行（datafeed.event_session_requests），避免影响交易回报，
+    此时数据服务的分段并发下载和批量下载不会加速，需要并发时可调大该设置。
+
+    数据服务先于交易接口初始化时会单独建立不带回调的连接，交易接口连接后数据服务在空闲时通过reacquire改用交易连接，
+    原连接无其他使用者时随之断开。
+    """
+
+    def __init__(self) -> None:
+        """构造函数"""
+        self.lock: Lock = Lock()
+        self.sessions: Dict[str, List[Session]] = {}
+        self.api_sessions: Dict[int, Session] = {}
+
+    def acquire(self, apppath: str, eventclass: object = None) -> TCoreAPI:
+        """获取已连接的TCoreAPI，eventclass不为空时返回带事件回调的连接"""
+        with self.lock:
+            sessions: List[Session] = self.sessions.setdefault(apppath, [])
+            for session in sessions:
+                if not eventclass or session.eventclass is eventclass:
+                    break
+            else:
+                if eventclass:
+                    api: TCoreAPI = TCoreAPI(apppath=apppath, eventclass=eventclass)
+                else:
+                    api: TCoreAPI = TCoreAPI(apppath=apppath)
+                api.connect()
+
+                if eventclass:
+                    max_requests: int = int(SETTINGS.get("datafeed.event_session_requests", 1))
+                else:
+                    max_requests: int = int(SETTINGS.get("datafeed.session_requests", 8))
+                session = Session(api, apppath, eventclass, max_requests)
+                # 带事件回调的连接排在前面，供历史数据请求优先复用
+                if eventclass:
+                    sessions.insert(0, session)
+                else:
+                    sessions.append(session)
+                self.api_sessions[id(api)] = session
+
+            session.ref_count += 1
+            return session.api
+
+    def reacquire(self, api: TCoreAPI) -> TCoreAPI:
+        """不带回调的连接在同路径已有交易连接时改用交易连接并释放原连接，调用方需确保原连接上没有进行中的请求"""
+        with self.lock:
+            session: Session = self.api_sessions.get(id(api), None)
+            if not session or session.eventclass:
+                return api
+
+            sessions: List[Session] = self.sessions[session.apppath]
+            if not sessions[0].eventclass:
+                return api
+
+            target: Session = sessions[0]
+            target.ref_count += 1
+
+        self.release(api)
+        return target.api
+
+    def release(self, api: TCoreAPI) -> None:
+        """释放连接，引用计数归零时断开"""
+        with self.lock:
+            session: Session = self.api_sessions.get(id(api), None)
+            if not session:
+                return
+
+            session.ref_count -= 1
+            if session.ref_count > 0:
+                return
+
+            self.api_sessions.pop(id(api))
+            self.sessions[session.apppath].remove(session)
+
+        session.api.disconnect()
+
+    @contextmanager
+    def request(self, api: TCoreAPI) -> Iterator[None]:
+        """历史数据请求上下文，同一连接的并发请求数不超过datafeed.session_requests（交易连接为datafeed.event_session_requests）"""
+        session: Session = self.api_sessions.get(id(api), None)
+        if not session:
+            yield
+            return
+
+        if not session.semaphore.acquire(blocking=False):
+            with session.lock:
+                session.wait_count += 1
+            session.semaphore.acquire()
+
+        with session.lock:
+            session.request_count += 1
+            session.active_count += 1
+            session.active_max = max(session.active_max, session.active_count)
+
+        start: float = perf_counter()
+        try:
+            yield
+        finally:
+            with session.lock:
+                session.active_count -= 1
+                session.busy_time += perf_counter() - start
+            session.semaphore.release()
+
+    def get_statistics(self) -> List[dict]:
+        """查询各连接的使用情况，利用率为请求占用时间与可用并发时间之比"""
+        statistics: List[dict] = []
+        with self.lock:
+            for session in self.api_sessions.values():
+                elapsed: float = max(perf_counter() - session.create_time, 1e-6)
+                statistics.append({
+                    "apppath": session.apppath,
+                    "event": session.eventclass is not None,
+                    "refs": session.ref_count,
+                    "requests": session.request_count,
+                    "active": session.active_count,
+                    "active_max": session.active_max,
+                    "waits": session.wait_count,
+                    "utilisation": session.busy_time / (elapsed * session.max_requests)
+                })
+        return statistics
+
+
+session_manager: SessionManager = SessionManager()
@@ -0,0 +1,654 @@
+# flake8: noqa
+"""
+IceTCore接口热点路径性能测试
+
+使用模拟的icetcore接口（simulator.py）运行，不依赖咏春大师客户端，可在Linux环境中运行。
+用法：python benchmark.py [测试名称[=参数] ...]
+例如：python benchmark.py onquote=quotes.pkl startup=20000
+"""
+import sys
+import pickle
+from time import perf_counter, process_time, sleep
+from threading import Thread
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from simulator import SimulatorSetting, install_simulator
+
+install_simulator()
+
+from vnpy.event import EventEngine
+from vnpy.trader.constant import Direction, Exchange, Interval, Offset, OrderType, Product
+from vnpy.trader.object import ContractData, HistoryRequest, OrderRequest, TickData
+from vnpy.trader.setting import SETTINGS
+
+from vnpy_icetcore import IceTCoreGateway
+from vnpy_icetcore.icetcore_product import product_classifier
+from vnpy_icetcore.icetcore_gateway import (
+    CHINA_TZ,
+    adjust_price,
+    symbol_contract_map,
+    symbol_index_map
+)
+
+
+def create_gateway() -> IceTCoreGateway:
+    """创建不连接客户端的接口实例"""
+    from icetcore import TCoreAPI
+
+    gateway: IceTCoreGateway = IceTCoreGateway(EventEngine(), "ICETCore")
+    gateway.api = TCoreAPI(eventclass=gateway.eventobj)
+    gateway.eventobj.active = True
+    gateway.on_tick = lambda tick: None
+    gateway.on_order = lambda order: None
+    gateway.write_log = lambda msg: None
+    return gateway
+
+
+def create_quotes(count: int, symbols: int = 200) -> List[dict]:
+    """生成模拟的行情推送数据"""
+    for i in range(symbols):
+        ice_symbol: str = f"TC.F.SHFE.rb{i}.202410"
+        contract: ContractData = ContractData(
+            symbol=f"rb{i}",
+            exchange=Exchange.SHFE,
+            name=ice_symbol.replace("TC.F.", ""),
+            product=Product.FUTURES,
+            size=10,
+            pricetick=1,
+            gateway_name="ICETCore"
+        )
+        symbol_contract_map["SHFE." + contract.symbol] = contract
+        symbol_index_map[ice_symbol] = ("SHFE." + contract.symbol, contract)
+
+    quotes: List[dict] = []
+    now: datetime = datetime.now()
+    for n in range(count):
+        quote: dict = {
+            "Symbol": f"TC.F.SHFE.rb{n % symbols}.202410",
+            "Exchange": "SHFE",
+            "DateTime": now,
+            "Volume": 1000 + n,
+            "Turnover": 3500000.0 + n,
+            "OpenInterest": 200000,
+            "Last": 3500.0,
+            "UpperLimit": 3700.0,
+            "LowerLimit": 3300.0,
+            "Open": 3490.0,
+            "High": 3510.0,
+            "Low": 3480.0,
+            "YClosedPrice": sys.float_info.max,
+            "Bid": 3499.0,
+            "Ask": 3501.0,
+            "BidVolume": 10,
+            "AskVolume": 12,
+        }
+        for i in range(1, 5):
+            quote[f"Bid{i}"] = 3499.0 - i
+            quote[f"Ask{i}"] = 3501.0 + i
+            quote[f"BidVolume{i}"] = 10 + i
+            quote[f"AskVolume{i}"] = 12 + i
+        quotes.append(quote)
+    return quotes
+
+
+def legacy_onquote(gateway: IceTCoreGateway, data: dict) -> TickData:
+    """优化前的行情转换逻辑，作为对照"""
+    contract: ContractData = gateway.get_contract(data)
+    tick: TickData = TickData(
+        symbol=contract.symbol,
+        exchange=contract.exchange,
+        datetime=data["DateTime"].replace(tzinfo=CHINA_TZ),
+        volume=data["Volume"]if data["Volume"] else 0,
+        turnover=data["Turnover"] if data["Turnover"] else 0,
+        open_interest=data["OpenInterest"] if "OpenInterest" in data.keys() else 0,
+        last_price=adjust_price(data["Last"]) if adjust_price(data["Last"]) else 0,
+        limit_up=data["UpperLimit"] if data["UpperLimit"] else 0,
+        limit_down=data["LowerLimit"] if data["LowerLimit"] else 0,
+        open_price=adjust_price(data["Open"]) if adjust_price(data["Open"]) else 0,
+        high_price=adjust_price(data["High"]) if adjust_price(data["High"]) else 0,
+        low_price=adjust_price(data["Low"]) if adjust_price(data["Low"]) else 0,
+        pre_close=adjust_price(data["YClosedPrice"]) if adjust_price(data["YClosedPrice"]) else 0,
+        bid_price_1=adjust_price(data["Bid"]) if adjust_price(data["Bid"]) else 0,
+        ask_price_1=adjust_price(data["Ask"]) if adjust_price(data["Ask"]) else 0,
+        bid_volume_1=data["BidVolume"] if data["BidVolume"] else 0,
+        ask_volume_1=data["AskVolume"] if data["AskVolume"] else 0,
+        gateway_name=gateway.gateway_name
+    )
+    if data["BidVolume1"] or data["AskVolume1"]:
+        tick.bid_price_2 = adjust_price(data["Bid1"])
+        tick.bid_price_3 = adjust_price(data["Bid2"])
+        tick.bid_price_4 = adjust_price(data["Bid3"])
+        tick.bid_price_5 = adjust_price(data["Bid4"])
+        tick.ask_price_2 = adjust_price(data["Ask1"])
+        tick.ask_price_3 = adjust_price(data["Ask2"])
+        tick.ask_price_4 = adjust_price(data["Ask3"])
+        tick.ask_price_5 = adjust_price(data["Ask4"])
+        tick.bid_volume_2 = data["BidVolume1"]
+        tick.bid_volume_3 = data["BidVolume2"]
+        tick.bid_volume_4 = data["BidVolume3"]
+        tick.bid_volume_5 = data["BidVolume4"]
+        tick.ask_volume_2 = data["AskVolume1"]
+        tick.ask_volume_3 = data["AskVolume2"]
+        tick.ask_volume_4 = data["AskVolume3"]
+        tick.ask_volume_5 = data["AskVolume4"]
+    gateway.on_tick(tick)
+    return tick
+
+
+def bench_onquote(path: str = "") -> None:
+    """行情转换吞吐量（ticks/秒），可传入pickle格式的录制行情列表"""
+    gateway: IceTCoreGateway = create_gateway()
+    quotes: List[dict] = create_quotes(100_000)
+    if path:
+        with open(path, "rb") as f:
+            quotes = pickle.load(f)
+
+    start: float = perf_counter()
+    for quote in quotes:
+        legacy_onquote(gateway, quote)
+    before: float = len(quotes) / (perf_counter() - start)
+
+    start = perf_counter()
+    for quote in quotes:
+        gateway.eventobj.onquote(quote)
+    after: float = len(quotes) / (perf_counter() - start)
+
+    print(f"onquote: 优化前 {before:,.0f} ticks/秒，优化后 {after:,.0f} ticks/秒，提升 {after / before:.2f} 倍")
+
+
+def bench_concurrent_orders(threads: str = "8") -> None:
+    """多线程并发下单压力测试，检查委托字段是否串扰"""
+    install_simulator(SimulatorSetting(order_yield=True))
+    gateway: IceTCoreGateway = create_gateway()
+    create_quotes(0)
+
+    count: int = 500
+    results: Dict[str, OrderRequest] = {}
+
+    def run(n: int) -> None:
+        for i in range(count):
+            req: OrderRequest = OrderRequest(
+                symbol=f"rb{(n * count + i) % 200}",
+                exchange=Exchange.SHFE,
+                direction=Direction.LONG if i % 2 else Direction.SHORT,
+                type=OrderType.LIMIT,
+                volume=n * count + i + 1,
+                price=3000 + n,
+                offset=Offset.OPEN if i % 3 else Offset.CLOSE
+            )
+            vt_orderid: str = gateway.send_order(req)
+            results[vt_orderid.split(".")[-1]] = req
+
+    workers: List[Thread] = [Thread(target=run, args=(n,)) for n in range(int(threads))]
+    start: float = perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    cost: float = perf_counter() - start
+
+    crossed: int = 0
+    for report_id, req in results.items():
+        fields: dict = gateway.api.reports[report_id]
+        if (
+            fields["Symbol"] != f"TC.F.SHFE.{req.symbol}.202410"
+            or fields["Price"] != req.price
+            or fields["OrderQty"] != req.volume
+            or fields["Side"] != (1 if req.direction == Direction.LONG else 2)
+            or fields["PositionEffect"] != (0 if req.offset == Offset.OPEN else 1)
+        ):
+            crossed += 1
+
+    print(f"concurrent_orders: {threads}线程共{len(results)}笔委托，耗时{cost:.2f}秒，字段串扰{crossed}笔")
+    print(f"concurrent_orders: 委托确认延时统计（毫秒）{gateway.get_order_ack_latency()}")
+
+
+def bench_batch_orders(size: str = "50") -> None:
+    """批量下单与逐笔下单的耗时和CPU占用对比"""
+    gateway: IceTCoreGateway = create_gateway()
+    create_quotes(0)
+
+    rounds: int = 200
+    reqs: List[OrderRequest] = [
+        OrderRequest(
+            symbol=f"rb{i % 5}",
+            exchange=Exchange.SHFE,
+            direction=Direction.LONG,
+            type=OrderType.LIMIT,
+            volume=1,
+            price=3500 + i,
+            offset=Offset.OPEN
+        )
+        for i in range(int(size))
+    ]
+
+    wall: float = perf_counter()
+    cpu: float = process_time()
+    for _ in range(rounds):
+        for req in reqs:
+            gateway.send_order(req)
+    single: tuple = (perf_counter() - wall, process_time() - cpu)
+
+    wall = perf_counter()
+    cpu = process_time()
+    for _ in range(rounds):
+        gateway.send_orders(reqs)
+    batch: tuple = (perf_counter() - wall, process_time() - cpu)
+
+    print(f"batch_orders: 逐笔下单 {rounds}轮x{size}笔 耗时{single[0]:.3f}秒 CPU{single[1]:.3f}秒")
+    print(f"batch_orders: 批量下单 {rounds}轮x{size}笔 耗时{batch[0]:.3f}秒 CPU{batch[1]:.3f}秒")
+
+
+# 产品分类测试用例（ICE代码, 产品类型）
+PRODUCT_CORPUS: List[tuple] = [
+    ("TC.S.SSE.600000", Product.EQUITY),
+    ("TC.S.SSE.900901", Product.EQUITY),
+    ("TC.S.SZSE.000001", Product.EQUITY),
+    ("TC.S.SZSE.300750", Product.EQUITY),
+    ("TC.S.SZSE.200002", Product.EQUITY),
+    ("TC.S.SSE.000300", Product.INDEX),
+    ("TC.S.SZSE.399001", Product.INDEX),
+    ("TC.S.SSE.510050", Product.ETF),
+    ("TC.S.SZSE.159915", Product.ETF),
+    ("TC.S.SSE.010107", Product.BOND),
+    ("TC.S.SSE.113050", Product.BOND),
+    ("TC.S.SSE.204001", Product.BOND),
+    ("TC.S.SZSE.101213", Product.BOND),
+    ("TC.S.SZSE.127045", Product.BOND),
+    ("TC.S.SZSE.131810", Product.BOND),
+    ("TC.S.SSE.500058", Product.FUND),
+    ("TC.S.SZSE.161005", Product.FUND),
+    ("TC.F.SHFE.rb.202410", Product.FUTURES),
+    ("TC.F.CFFEX.IF.HOT", Product.FUTURES),
+    ("TC.O.SSE.510050.202410.C.2.5", Product.OPTION),
+    ("TC.O.CFFEX.IO.202410.P.3800", Product.OPTION),
+    ("TC.F2.DCE.SP m2409&m2501", Product.SPREAD),
+]
+
+
+def legacy_classify(symb: str) -> Product:
+    """优化前的子串匹配分类逻辑，作为对照"""
+    if "TC.O." in symb:
+        return Product.OPTION
+    elif "TC.S.SSE.60" in symb or "TC.S.SSE.90" in symb or "TC.S.SZSE.00" in symb or "TC.S.SZSE.30" in symb or "TC.S.SZSE.20" in symb:
+        return Product.EQUITY
+    elif "TC.S.SSE.000" in symb or "TC.S.SZSE.399" in symb:
+        return Product.INDEX
+    elif "TC.S.SSE.51" in symb or "TC.S.SZSE.15" in symb:
+        return Product.ETF
+    elif "TC.S.SSE.01" in symb or "TC.S.SSE.11" in symb or "TC.S.SSE.20" in symb or "TC.S.SZSE.10" in symb or "TC.S.SZSE.12" in symb or "TC.S.SZSE.13" in symb:
+        return Product.BOND
+    elif "TC.S.SSE.50" in symb or "TC.S.SZSE.16" in symb:
+        return Product.FUND
+    elif "TC.F2." in symb:
+        return Product.SPREAD
+    else:
+        return Product.FUTURES
+
+
+def create_universe() -> List[str]:
+    """通过模拟接口的getallsymbol生成全市场ICE代码"""
+    from icetcore import TCoreAPI
+
+    install_simulator(SimulatorSetting(futures_count=3000, option_count=3000, stock_count=40000))
+    api = TCoreAPI()
+    universe: List[str] = api.getallsymbol()
+    api.disconnect()
+    return universe
+
+
+def bench_classifier() -> None:
+    """产品分类器正确性与全市场分类耗时"""
+    for symb, product in PRODUCT_CORPUS:
+        result: Product = product_classifier.classify(symb)
+        assert result == product, f"{symb}分类错误：{result}，应为{product}"
+
+    universe: List[str] = create_universe()
+    mismatched: int = sum(1 for symb in universe if product_classifier.classify(symb) != legacy_classify(symb))
+
+    start: float = perf_counter()
+    for symb in universe:
+        legacy_classify(symb)
+    before: float = perf_counter() - start
+
+    start = perf_counter()
+    for symb in universe:
+        product_classifier.classify(symb)
+    after: float = perf_counter() - start
+
+    print(f"classifier: {len(PRODUCT_CORPUS)}个测试用例通过，全市场{len(universe)}个代码与原逻辑不一致{mismatched}个")
+    print(f"classifier: 子串匹配 {before * 1000:.1f}毫秒，前缀映射 {after * 1000:.1f}毫秒")
+
+
+def bench_batch_history(count: str = "50") -> None:
+    """多合约批量下载与逐个下载K线的耗时对比"""
+    from vnpy_icetcore import Datafeed
+
+    SETTINGS["datafeed.cache_size"] = 0
+    datafeed = Datafeed()
+    create_quotes(0, int(count))
+
+    reqs: List[HistoryRequest] = [
+        HistoryRequest(
+            symbol=f"rb{i}",
+            exchange=Exchange.SHFE,
+            start=datetime(2024, 1, 1),
+            end=datetime(2024, 1, 5),
+            interval=Interval.MINUTE
+        )
+        for i in range(int(count))
+    ]
+    output: Callable = lambda msg: None
+
+    start: float = perf_counter()
+    single: int = sum(len(datafeed.query_bar_history(req, output)) for req in reqs)
+    before: float = perf_counter() - start
+
+    start = perf_counter()
+    batch: int = sum(len(bars) for bars in datafeed.query_bar_history_batch(reqs, output).values())
+    after: float = perf_counter() - start
+
+    print(f"batch_history: 逐个下载{count}个合约共{single}条，耗时{before:.2f}秒")
+    print(f"batch_history: 批量下载{count}个合约共{batch}条，耗时{after:.2f}秒（{datafeed.max_workers}线程）")
+
+
+def legacy_rows_to_ticks(rows: List[dict], symbol: str, exchange: Exchange) -> List[TickData]:
+    """优化前的逐行Tick转换逻辑，作为对照"""
+    ticks: List[TickData] = []
+    for row in rows:
+        tick: TickData = TickData(
+            symbol=symbol,
+            exchange=exchange,
+            datetime=row["DateTime"].replace(tzinfo=CHINA_TZ),
+            open_price=row["Last"],
+            high_price=row["Last"],
+            low_price=row["Last"],
+            last_price=row["Last"],
+            volume=row["Quantity"],
+            open_interest=row["OpenInterest"],
+            bid_price_1=row["Bid"],
+            ask_price_1=row["Ask"],
+            bid_volume_1=row["OpenInterest"],
+            ask_volume_1=row["OpenInterest"],
+            gateway_name="ICETCore"
+        )
+        ticks.append(tick)
+    return ticks
+
+
+def bench_tick_history(count: str = "1000000") -> None:
+    """Tick历史数据转换速度，列式转换使用全部数据，TickData转换使用前10万条"""
+    from vnpy_icetcore.icetcore_datafeed import rows_to_tick_array, tick_array_to_ticks
+
+    start: datetime = datetime(2024, 1, 2, 9)
+    rows: List[dict] = [
+        {
+            "DateTime": start + timedelta(milliseconds=500 * n),
+            "Last": 3500.0 + n % 10,
+            "Quantity": n % 7 + 1,
+            "OpenInterest": 200000 + n % 100,
+            "Bid": 3499.0 + n % 10,
+            "Ask": 3501.0 + n % 10,
+            "BidVolume": 10 + n % 5,
+            "AskVolume": 12 + n % 5,
+        }
+        for n in range(int(count))
+    ]
+
+    t: float = perf_counter()
+    array = rows_to_tick_array(rows)
+    columnar: float = perf_counter() - t
+    assert (array["bid_volume_1"] == [row["BidVolume"] for row in rows]).all()
+
+    subset: List[dict] = rows[:100000]
+    t = perf_counter()
+    legacy_rows_to_ticks(subset, "rb2410", Exchange.SHFE)
+    before: float = perf_counter() - t
+
+    t = perf_counter()
+    subset_array = rows_to_tick_array(subset)
+    middle: float = perf_counter()
+    ticks: List[TickData] = tick_array_to_ticks(subset_array, "rb2410", Exchange.SHFE)
+    after: float = perf_counter() - t
+    convert: float = perf_counter() - middle
+    assert ticks[-1].ask_volume_1 == subset[-1]["AskVolume"]
+
+    # query_tick_history返回TickData，与逐行转换对比的是列式转换加TickData转换的总耗时
+    print(f"tick_history: 列式转换{len(rows)}条，耗时{columnar:.2f}秒（{len(rows) / columnar:.0f}条/秒）")
+    print(f"tick_history: 逐行TickData转换{len(subset)}条，耗时{before:.2f}秒（{len(subset) / before:.0f}条/秒）")
+    print(
+        f"tick_history: 列式后TickData转换{len(subset)}条，耗时{after:.2f}秒（{len(subset) / after:.0f}条/秒），"
+        f"其中TickData转换{convert:.2f}秒"
+    )
+
+
+def bench_report_time(count: str = "100000") -> None:
+    """委托成交回报时间转换耗时，对比逐条strptime解析"""
+    from vnpy_icetcore.icetcore_gateway import TransactTimeConverter
+
+    reports: List[dict] = [
+        {
+            "TransactDate": f"202401{n % 5 + 2:02d}",
+            "TransactTime": f"{n % 24:02d}{n % 60:02d}{n * 7 % 60:02d}"
+        }
+        for n in range(int(count))
+    ]
+
+    start: float = perf_counter()
+    legacy: List[datetime] = []
+    for data in reports:
+        timestamp: str = f"{data['TransactDate']} {data['TransactTime']}"
+        dt: datetime = datetime.strptime(timestamp, "%Y%m%d %H%M%S")
+        legacy.append(dt.replace(tzinfo=CHINA_TZ) + timedelta(hours=8))
+    before: float = perf_counter() - start
+
+    converter: TransactTimeConverter = TransactTimeConverter()
+    start = perf_counter()
+    result: List[datetime] = [converter.convert(data["TransactDate"], data["TransactTime"]) for data in reports]
+    after: float = perf_counter() - start
+
+    assert result == legacy
+    print(f"report_time: {count}条回报 strptime解析 {before * 1000:.1f}毫秒，缓存转换 {after * 1000:.1f}毫秒")
+
+
+
+def connect_gateway(setting: dict = None, write_log: Callable = None) -> IceTCoreGateway:
+    """创建接口并连接模拟客户端，等待合约加载完成，合约缓存使用独立目录"""
+    from vnpy_icetcore.icetcore_cache import ContractCache
+
+    symbol_contract_map.clear()
+    symbol_index_map.clear()
+
+    gateway: IceTCoreGateway = IceTCoreGateway(EventEngine(), "ICETCore")
+    gateway.contract_cache = ContractCache("icetcore_benchmark")
+    gateway.on_tick = lambda tick: None
+    gateway.on_order = lambda order: None
+    gateway.on_trade = lambda trade: None
+    gateway.on_position = lambda position: None
+    gateway.on_account = lambda account: None
+    gateway.on_contract = lambda contract: None
+    gateway.write_log = write_log or (lambda msg: None)
+
+    connect_setting: dict = dict(IceTCoreGateway.default_setting)
+    connect_setting.update(setting or {})
+    gateway.connect(connect_setting)
+    while not gateway.contract_inited:
+        sleep(0.001)
+    return gateway
+
+
+def print_latency(name: str, snapshot: Dict[str, Dict[str, float]]) -> None:
+    """输出延时分布（毫秒）"""
+    for key, data in snapshot.items():
+        print(
+            f"{name}: {key} {data['count']}次 平均{data['avg']:.3f} "
+            f"P50 {data['p50']:.3f} P99 {data['p99']:.3f} 最大{data['max']:.3f}毫秒"
+        )
+
+
+def bench_startup(count: str = "10000") -> None:
+    """合约加载（qryInstrument）冷启动和热启动耗时，每次合约信息查询模拟0.1毫秒延时"""
+    from vnpy_icetcore.icetcore_cache import ContractCache
+
+    total: int = int(count)
+    install_simulator(SimulatorSetting(
+        futures_count=total // 5,
+        option_count=total * 3 // 10,
+        stock_count=total // 2,
+        symbol_latency=0.0001
+    ))
+    for path in ContractCache("icetcore_benchmark").folder_path.glob("contract_*.pkl"):
+        path.unlink()
+
+    for mode in ("冷启动", "热启动"):
+        logs: List[str] = []
+        start: float = perf_counter()
+        gateway: IceTCoreGateway = connect_gateway(write_log=logs.append)
+        cost: float = perf_counter() - start
+        queries: int = gateway.api.get_statistics()["symbol_queries"]
+        gateway.close()
+
+        print(f"startup: {mode}{count}个代码，耗时{cost:.3f}秒，合约信息查询{queries}次")
+        print(f"startup: {[msg for msg in logs if msg.startswith('合约信息查询成功')][0]}")
+
+
+def bench_quote_stream(rate: str = "0") -> None:
+    """模拟客户端连续推送行情时接口的吞吐量和各环节延时，rate为每秒推送条数，0表示不限速"""
+    from vnpy.trader.object import SubscribeRequest
+
+    install_simulator(SimulatorSetting(futures_count=100, option_count=0, stock_count=0, quote_rate=float(rate)))
+    gateway: IceTCoreGateway = connect_gateway({"延时统计输出间隔(秒)": 60})
+    received: List[int] = [0]
+
+    def on_tick(tick: TickData) -> None:
+        received[0] += 1
+
+    gateway.on_tick = on_tick
+
+    duration: float = 3
+    for contract in list(symbol_contract_map.values()):
+        gateway.subscribe(SubscribeRequest(contract.symbol, contract.exchange))
+    start: float = perf_counter()
+    sleep(duration)
+    for symbol in list(gateway.api.subscribed):
+        gateway.api.unsubquote(symbol)
+    cost: float = perf_counter() - start
+    gateway.close()
+
+    pushed: int = gateway.api.get_statistics()["quotes"]
+    print(f"quote_stream: {len(symbol_contract_map)}个合约推送{pushed}条，接收{received[0]}条，{received[0] / cost:,.0f} ticks/秒")
+    print_latency("quote_stream", gateway.get_latency_snapshot())
+
+
+def bench_order_latency(count: str = "1000") -> None:
+    """逐笔下单的send_order耗时，以及模拟确认0.2毫秒、成交0.5毫秒时的确认和成交延时"""
+    from vnpy_icetcore.icetcore_latency import LatencyRecorder
+
+    install_simulator(SimulatorSetting(
+        futures_count=20,
+        option_count=0,
+        stock_count=0,
+        order_latency=0.0002,
+        fill_latency=0.0005
+    ))
+    gateway: IceTCoreGateway = connect_gateway({"延时统计输出间隔(秒)": 60})
+    trades: List[int] = [0]
+
+    def on_trade(trade) -> None:
+        trades[0] += 1
+
+    gateway.on_trade = on_trade
+
+    contract: ContractData = next(iter(symbol_contract_map.values()))
+    recorder: LatencyRecorder = LatencyRecorder()
+    for i in range(int(count)):
+        req: OrderRequest = OrderRequest(
+            symbol=contract.symbol,
+            exchange=contract.exchange,
+            direction=Direction.LONG if i % 2 else Direction.SHORT,
+            type=OrderType.LIMIT,
+            volume=1,
+            price=3500,
+            offset=Offset.OPEN
+        )
+        start: float = perf_counter()
+        gateway.send_order(req)
+        recorder.record("send_order", perf_counter() - start)
+
+    deadline: float = perf_counter() + 5
+    while trades[0] < int(count) and perf_counter() < deadline:
+        sleep(0.01)
+    gateway.close()
+
+    print(f"order_latency: {count}笔委托，收到成交{trades[0]}笔")
+    print_latency("order_latency", recorder.get_snapshot())
+    print_latency("order_latency", gateway.get_latency_snapshot())
+
+
+def bench_history(days: str = "3") -> None:
+    """数据服务下载分钟K线和Tick的吞吐量，每次历史数据请求模拟20毫秒延时，不使用本地缓存"""
+    from vnpy_icetcore import Datafeed
+    import icetcore
+
+    install_simulator(SimulatorSetting(futures_count=20, option_count=0, stock_count=0, history_latency=0.02))
+    symbol_contract_map.clear()
+    symbol_index_map.clear()
+    SETTINGS["datafeed.cache_size"] = 0
+    datafeed = Datafeed()
+    datafeed.init()
+    output: Callable = lambda msg: None
+
+    start: datetime = datetime(2024, 1, 2)
+    end: datetime = start + timedelta(days=int(days))
+    reqs: List[HistoryRequest] = []
+    for ice_symbol in icetcore.market.symbols:
+        reqs.append(HistoryRequest(
+            symbol=icetcore.market.infos[ice_symbol][0],
+            exchange=Exchange(ice_symbol.split(".")[2]),
+            start=start,
+            end=end,
+            interval=Interval.MINUTE
+        ))
+
+    t: float = perf_counter()
+    bars: int = sum(len(bars) for bars in datafeed.query_bar_history_batch(reqs, output).values())
+    bar_cost: float = perf_counter() - t
+
+    reqs[0].interval = Interval.TICK
+    t = perf_counter()
+    ticks: int = len(datafeed.query_tick_history(reqs[0], output))
+    tick_cost: float = perf_counter() - t
+    datafeed.close()
+
+    print(f"history: {len(reqs)}个合约{days}天分钟K线共{bars}条，耗时{bar_cost:.2f}秒（{bars / bar_cost:,.0f}条/秒）")
+    print(f"history: 1个合约{days}天Tick共{ticks}条，耗时{tick_cost:.2f}秒（{ticks / tick_cost:,.0f}条/秒，含模拟数据生成）")
+
+BENCHMARKS: Dict[str, Callable] = {
+    "onquote": bench_onquote,
+    "concurrent_orders": bench_concurrent_orders,
+    "batch_orders": bench_batch_orders,
+    "classifier": bench_classifier,
+    "batch_history": bench_batch_history,
+    "tick_history": bench_tick_history,
+    "report_time": bench_report_time,
+    "startup": bench_startup,
+    "quote_stream": bench_quote_stream,
+    "order_latency": bench_order_latency,
+    "history": bench_history,
+}
+
+
+def main() -> None:
+    """"""
+    names: List[str] = sys.argv[1:] or list(BENCHMARKS.keys())
+    for name in names:
+        name, _, arg = name.partition("=")
+        if arg:
+            BENCHMARKS[name](arg)
+        else:
+            BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,640 @@
+# flake8: noqa
+"""
+模拟的icetcore接口
+
+纯Python实现的TCoreAPI，用于在未安装咏春大师客户端的环境（如Linux）中运行接口和性能测试。
+合约数量、行情推送频率、合约查询/委托确认/成交/历史数据请求的延时均可通过SimulatorSetting配置。
+委托和历史数据请求不校验代码，合约全集以外的代码按默认合约信息处理。
+
+用法（需在导入vnpy_icetcore之前调用）：
+    from simulator import SimulatorSetting, install_simulator
+    install_simulator(SimulatorSetting(futures_count=500, quote_rate=10000))
+
+委托回报、成交回报、持仓和资金推送在推送线程中按设定延时依次回调，行情在独立的行情线程中推送。
+"""
+import sys
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from threading import Condition, Lock, Thread
+from time import perf_counter, sleep
+from typing import Callable, Dict, List, Tuple
+from zoneinfo import ZoneInfo
+
+
+CHINA_TZ = ZoneInfo("Asia/Shanghai")
+
+# 期货品种（交易所, 品种, 合约乘数, 最小变动价位, 参考价格）
+FUTURES_PRODUCTS: List[tuple] = [
+    ("SHFE", "rb", 10, 1, 3500),
+    ("SHFE", "cu", 5, 10, 70000),
+    ("SHFE", "au", 1000, 0.02, 480),
+    ("DCE", "m", 10, 1, 3000),
+    ("DCE", "i", 100, 0.5, 800),
+    ("CZCE", "SR", 10, 1, 6000),
+    ("CZCE", "TA", 5, 2, 5800),
+    ("CFFEX", "IF", 300, 0.2, 3500),
+    ("CFFEX", "IC", 200, 0.2, 5500),
+    ("INE", "sc", 1000, 0.1, 600),
+    ("GFEX", "si", 5, 5, 13000),
+]
+
+# 期权品种（交易所, 品种, 合约乘数, 最小变动价位, 标的参考价格）
+OPTION_PRODUCTS: List[tuple] = [
+    ("SHFE", "cu", 5, 2, 70000),
+    ("DCE", "m", 10, 0.5, 3000),
+    ("CFFEX", "IO", 100, 0.2, 3800),
+    ("SSE", "510050", 10000, 0.0001, 2.5),
+]
+
+# 交易时段（开始时间, 结束时间），用于生成历史数据
+TRADING_SESSIONS: List[Tuple[timedelta, timedelta]] = [
+    (timedelta(hours=9), timedelta(hours=11, minutes=30)),
+    (timedelta(hours=13, minutes=30), timedelta(hours=15)),
+    (timedelta(hours=21), timedelta(hours=23)),
+]
+
+# 合约全集以外代码使用的默认合约信息
+DEFAULT_INFO: tuple = ("", 1, 1, "", 3500)
+
+# 委托终态（全部成交、已撤销、拒单）
+FINISHED_EXECTYPES: set = {3, 8, 10}
+
+
+@dataclass
+class SimulatorSetting:
+    """模拟接口参数，延时单位均为秒"""
+
+    futures_count: int = 200            # 期货合约数
+    option_count: int = 200             # 期权合约数
+    stock_count: int = 1000             # 证券代码数，均匀分布在沪深两市的代码区间
+    quote_rate: float = 0               # 每秒推送的行情条数，0表示不限速
+    connect_latency: float = 0.05       # 连接成功回报的延时
+    symbol_latency: float = 0           # 每次合约信息查询的延时
+    order_latency: float = 0            # 委托确认（可查询委托信息并推送委托回报）的延时
+    fill_latency: float = -1            # 委托确认后到全部成交的延时，小于0时委托不成交
+    history_latency: float = 0.02       # 每次历史数据请求的延时
+    tick_interval: int = 500            # 历史Tick的时间间隔（毫秒）
+    order_yield: bool = False           # 读取委托字段时主动让出线程，放大并发下单时的字段串扰
+
+
+class SimulatedMarket:
+    """模拟的合约全集"""
+
+    def __init__(self, setting: SimulatorSetting) -> None:
+        """构造函数"""
+        self.symbols: List[str] = []
+
+        # ICE代码：(合约代码, 合约乘数, 最小变动价位, 到期日, 参考价格)
+        self.infos: Dict[str, tuple] = {}
+
+        self.add_futures(setting.futures_count)
+        self.add_options(setting.option_count)
+        self.add_stocks(setting.stock_count)
+
+    def add_symbol(self, ice_symbol: str, symbol_id: str, size: int, pricetick: float, expiry: str, price: float) -> None:
+        """添加合约"""
+        self.symbols.append(ice_symbol)
+        self.infos[ice_symbol] = (symbol_id, size, pricetick, expiry, price)
+
+    def add_futures(self, total: int) -> None:
+        """按品种轮流生成连续月份的期货合约"""
+        for i in range(total):
+            exchange, product, size, pricetick, price = FUTURES_PRODUCTS[i % len(FUTURES_PRODUCTS)]
+            month: str = get_month(i // len(FUTURES_PRODUCTS))
+            symbol_id: str = product + (month[3:] if exchange == "CZCE" else month[2:])
+            self.add_symbol(f"TC.F.{exchange}.{product}.{month}", symbol_id, size, pricetick, month + "15", price)
+
+    def add_options(self, total: int) -> None:
+        """按品种、行权价、看涨看跌、月份依次生成期权合约"""
+        for i in range(total):
+            exchange, product, size, pricetick, price = OPTION_PRODUCTS[i % len(OPTION_PRODUCTS)]
+            n: int = i // len(OPTION_PRODUCTS)
+            strike: str = f"{round(price * (0.9 + n % 10 * 0.02) / pricetick) * pricetick:g}"
+            option_type: str = "CP"[n // 10 % 2]
+            month: str = get_month(n // 20)
+
+            if exchange == "SSE":
+                symbol_id: str = str(10000001 + i)
+            else:
+                symbol_id: str = f"{product}{month[2:]}-{option_type}-{strike}"
+            ice_symbol: str = f"TC.O.{exchange}.{product}.{month}.{option_type}.{strike}"
+            self.add_symbol(ice_symbol, symbol_id, size, pricetick, month + "20", price * 0.05)
+
+    def add_stocks(self, total: int) -> None:
+        """在沪深两市的代码区间内均匀生成证券代码，覆盖股票、指数、基金、债券等各类代码段"""
+        half: int = total // 2
+        if not half:
+            return
+
+        step: int = max(1000000 // half, 1)
+        for exchange in ("SSE", "SZSE"):
+            for code in range(0, 1000000, step)[:half]:
+                symbol_id: str = f"{code:06d}"
+                self.add_symbol(f"TC.S.{exchange}.{symbol_id}", symbol_id, 1, 0.01, "", 10)
+
+
+class QuoteEvent:
+    """行情事件回调基类"""
+    pass
+
+
+class TradeEvent:
+    """交易事件回调基类"""
+    pass
+
+
+class OrderStruct:
+    """委托结构"""
+
+    Symbol: str = ""
+    BrokerID: str = ""
+    Account: str = ""
+    Price: float = 0
+    TimeInForce: int = 1
+    Side: int = 1
+    OrderType: int = 2
+    OrderQty: int = 0
+    PositionEffect: int = 0
+    Synthetic: int = 0
+    SelfTradePrevention: int = 3
+
+
+class TCoreAPI:
+    """模拟的TCoreAPI"""
+
+    def __init__(self, apppath: str = "", eventclass: object = None) -> None:
+        """构造函数"""
+        self.apppath: str = apppath
+        self.eventclass: object = eventclass
+
+        self.account: dict = {"AccMask": "SIM-SIM001", "Account": "SIM001", "BrokerID": "SIM"}
+        self.margin: dict = {
+            "Account": "SIM001",
+            "BrokerID": "SIM",
+            "TotalEquity": 10_000_000.0,
+            "FrozenCash": 0.0,
+            "ExcessEquity": 10_000_000.0
+        }
+
+        self.lock: Lock = Lock()
+        self.order_count: count = count(1)
+        self.trade_count: count = count(1)
+        self.orders: Dict[str, list] = {}           # 委托编号：委托信息列表
+        self.reports: Dict[str, dict] = {}          # ReportID：委托回报
+        self.fills: List[dict] = []
+        self.positions: Dict[str, dict] = {}
+
+        # 推送线程按到期时间依次执行的任务
+        self.active: bool = True
+        self.condition: Condition = Condition()
+        self.tasks: List[tuple] = []
+        self.task_count: count = count()
+        self.push_thread: Thread = Thread(target=self.run_push, daemon=True)
+        self.push_thread.start()
+
+        # 行情线程
+        self.subscribed: List[str] = []
+        self.quote_templates: Dict[str, dict] = {}
+        self.quote_thread: Thread = None
+
+        self.statistics: Dict[str, int] = {
+            "symbol_queries": 0,
+            "quotes": 0,
+            "orders": 0,
+            "fills": 0,
+            "history_requests": 0,
+            "history_rows": 0
+        }
+
+    def connect(self) -> None:
+        """连接客户端，连接成功回报异步推送"""
+        self.schedule(self.setting.connect_latency, self.push, "onservertime", datetime.now())
+        self.schedule(self.setting.connect_latency, self.push, "onaccountlist", [dict(self.account)], 1)
+        self.schedule(self.setting.connect_latency, self.push, "onconnected", "quote")
+        self.schedule(self.setting.connect_latency, self.push, "onconnected", "trade")
+
+    def disconnect(self) -> None:
+        """断开连接，停止推送线程和行情线程"""
+        self.active = False
+        with self.condition:
+            self.condition.notify()
+
+    @property
+    def setting(self) -> SimulatorSetting:
+        """当前模拟参数，install_simulator重新调用后立即生效"""
+        return setting
+
+    def schedule(self, delay: float, func: Callable, *args) -> None:
+        """在推送线程中延时执行任务"""
+        with self.condition:
+            heapq.heappush(self.tasks, (perf_counter() + delay, next(self.task_count), func, args))
+            self.condition.notify()
+
+    def run_push(self) -> None:
+        """推送线程主循环"""
+        while self.active:
+            with self.condition:
+                if not self.tasks:
+                    self.condition.wait(0.1)
+                    continue
+
+                wait: float = self.tasks[0][0] - perf_counter()
+                if wait > 0:
+                    self.condition.wait(wait)
+                    continue
+                _, _, func, args = heapq.heappop(self.tasks)
+
+            func(*args)
+
+    def push(self, name: str, *args) -> None:
+        """回调事件对象的推送函数"""
+        if not self.eventclass:
+            return
+
+        func: Callable = getattr(self.eventclass, name, None)
+        if func:
+            func(*args)
+
+    def query_symbol(self, symbol: str) -> tuple:
+        """查询合约信息，模拟与客户端的通信延时"""
+        self.statistics["symbol_queries"] += 1
+        if self.setting.symbol_latency:
+            sleep(self.setting.symbol_latency)
+        return market.infos.get(symbol, None)
+
+    def getallsymbol(self) -> List[str]:
+        """查询全部合约代码"""
+        return list(market.symbols)
+
+    def getsymbol_id(self, symbol: str) -> str:
+        """查询合约代码"""
+        info: tuple = self.query_symbol(symbol)
+        return info[0] if info else ""
+
+    def getsymbolvolume_multiple(self, symbol: str) -> int:
+        """查询合约乘数"""
+        info: tuple = self.query_symbol(symbol)
+        return info[1] if info else 0
+
+    def getsymbol_ticksize(self, symbol: str) -> float:
+        """查询最小变动价位"""
+        info: tuple = self.query_symbol(symbol)
+        return info[2] if info else 0
+
+    def getexpirationdate(self, symbol: str) -> str:
+        """查询到期日"""
+        info: tuple = self.query_symbol(symbol)
+        return info[3] if info else ""
+
+    def subquote(self, symbol: str) -> None:
+        """订阅行情，首次订阅时启动行情线程"""
+        if symbol not in market.infos:
+            return
+
+        with self.lock:
+            if symbol not in self.subscribed:
+                self.subscribed = self.subscribed + [symbol]
+
+            if not self.quote_thread:
+                self.quote_thread = Thread(target=self.run_quote, daemon=True)
+                self.quote_thread.start()
+
+    def unsubquote(self, symbol: str) -> None:
+        """退订行情"""
+        with self.lock:
+            self.subscribed = [s for s in self.subscribed if s != symbol]
+
+    def create_quote(self, symbol: str, n: int) -> dict:
+        """基于合约的行情模板生成一条行情"""
+        template: dict = self.quote_templates.get(symbol, None)
+        if not template:
+            _, _, pricetick, _, price = market.infos[symbol]
+            template = {
+                "Symbol": symbol,
+                "Exchange": symbol.split(".")[2],
+                "Volume": 0,
+                "Turnover": 0.0,
+                "OpenInterest": 200000,
+                "UpperLimit": price * 1.1,
+                "LowerLimit": price * 0.9,
+                "Open": price,
+                "High": price * 1.01,
+                "Low": price * 0.99,
+                "YClosedPrice": price,
+            }
+            for i in range(5):
+                suffix: str = str(i) if i else ""
+                template["Bid" + suffix] = price - pricetick * (i + 1)
+                template["Ask" + suffix] = price + pricetick * (i + 1)
+                template["BidVolume" + suffix] = 10 + i
+                template["AskVolume" + suffix] = 12 + i
+            self.quote_templates[symbol] = template
+
+        quote: dict = template.copy()
+        quote["DateTime"] = datetime.now(CHINA_TZ).replace(tzinfo=None)
+        quote["Last"] = template["Bid"] if n % 2 else template["Ask"]
+        quote["Volume"] = n
+        quote["Turnover"] = n * quote["Last"]
+        return quote
+
+    def run_quote(self) -> None:
+        """行情线程主循环，按设定频率轮流推送已订阅合约的行情"""
+        n: int = 0
+        start: float = perf_counter()
+        while self.active:
+            symbols: List[str] = self.subscribed
+            if not symbols:
+                sleep(0.01)
+                start = perf_counter()
+                n = 0
+                continue
+
+            for symbol in symbols:
+                n += 1
+                self.push("onquote", self.create_quote(symbol, n))
+                self.statistics["quotes"] += 1
+
+                rate: float = self.setting.quote_rate
+                if rate:
+                    delay: float = start + n / rate - perf_counter()
+                    if delay > 0.001:
+                        sleep(delay)
+
+    def neworder(self, order: OrderStruct) -> Tuple[str, str]:
+        """委托下单，返回委托编号，委托确认和回报按设定延时推送"""
+        fields: dict = {}
+        for name in ("Symbol", "Price", "Side", "OrderQty", "PositionEffect", "OrderType", "TimeInForce"):
+            fields[name] = getattr(order, name)
+            if self.setting.order_yield:
+                sleep(0)
+
+        self.statistics["orders"] += 1
+        ordid: str = str(next(self.order_count))
+        date, time = get_transact_time()
+        fields.update({
+            "Exchange": fields["Symbol"].split(".")[2],
+            "ReportID": "SIM" + ordid,
+            "OrderID": "",
+            "CumQty": 0,
+            "AvgPrice": 0,
+            "ExecType": 0,
+            "TransactDate": date,
+            "TransactTime": time,
+            "UserKey1": "",
+            "Account": order.Account,
+            "BrokerID": order.BrokerID
+        })
+        self.schedule(self.setting.order_latency, self.accept_order, ordid, fields)
+        return ordid, ""
+
+    def accept_order(self, ordid: str, report: dict) -> None:
+        """委托确认，可查询委托信息并推送委托回报"""
+        with self.lock:
+            self.orders[ordid] = [report]
+            self.reports[report["ReportID"]] = report
+        self.push("onordereportreal", dict(report))
+
+        if self.setting.fill_latency >= 0:
+            self.schedule(self.setting.fill_latency, self.fill_order, report["ReportID"])
+
+    def fill_order(self, report_id: str) -> None:
+        """委托全部成交，推送委托回报、成交回报、持仓和资金"""
+        with self.lock:
+            report: dict = self.reports[report_id]
+            if report["ExecType"] in FINISHED_EXECTYPES:
+                return
+
+            volume: int = report["OrderQty"] - report["CumQty"]
+            date, time = get_transact_time()
+            report.update({
+                "CumQty": report["OrderQty"],
+                "AvgPrice": report["Price"],
+                "ExecType": 3,
+                "TransactDate": date,
+                "TransactTime": time
+            })
+
+            fill: dict = {
+                "Symbol": report["Symbol"],
+                "Exchange": report["Exchange"],
+                "ReportID": report_id,
+                "DetailReportID": report_id,
+                "OrderID": "T" + str(next(self.trade_count)),
+                "Side": report["Side"],
+                "PositionEffect": report["PositionEffect"],
+                "MatchedPrice": report["Price"],
+                "MatchedQty": volume,
+                "AvgPrice": report["Price"],
+                "CumQty": volume,
+                "TransactDate": date,
+                "TransactTime": time
+            }
+            self.fills.append(fill)
+            position: dict = self.update_position(fill)
+            self.statistics["fills"] += 1
+
+        self.push("onordereportreal", dict(report))
+        self.push("onfilledreportreal", dict(fill))
+        self.push("onposition", self.account["AccMask"], [dict(position)])
+        self.push("onmargin", self.account["AccMask"], [dict(self.margin)])
+
+    def update_position(self, fill: dict) -> dict:
+        """根据成交更新持仓和资金"""
+        symbol: str = fill["Symbol"]
+        position: dict = self.positions.get(symbol, None)
+        if not position:
+            position = {
+                "Account": self.account["Account"],
+                "Symbol": symbol,
+                "Exchange": fill["Exchange"],
+                "Side": 0,
+                "Quantity": 0,
+                "AvgPrice": 0.0,
+                "FloatProfitByDate": 0.0,
+            }
+            for side in ("Long", "Short"):
+                position.update({
+                    f"Sum{side}Qty": 0,
+                    f"{side}OpenPrice": 0.0,
+                    f"{side}Frozen": 0,
+                    f"{side}FloatProfitByDate": 0.0,
+                    f"Yd{side}Qty": 0
+                })
+            self.positions[symbol] = position
+
+        volume: int = fill["MatchedQty"]
+        price: float = fill["MatchedPrice"]
+        long_side: bool = fill["Side"] == 1
+        if fill["PositionEffect"] == 0:
+            side: str = "Long" if long_side else "Short"
+            cost: float = position[f"{side}OpenPrice"] * position[f"Sum{side}Qty"] + price * volume
+            position[f"Sum{side}Qty"] += volume
+            position[f"{side}OpenPrice"] = cost / position[f"Sum{side}Qty"]
+        else:
+            side: str = "Short" if long_side else "Long"
+            position[f"Sum{side}Qty"] = max(position[f"Sum{side}Qty"] - volume, 0)
+
+        side = "Long" if position["SumLongQty"] >= position["SumShortQty"] else "Short"
+        position["Side"] = 1 if side == "Long" else 2
+        position["Quantity"] = position[f"Sum{side}Qty"]
+        position["AvgPrice"] = position[f"{side}OpenPrice"]
+
+        # 按持仓市值的10%计算保证金
+        margin: float = sum(
+            (p["SumLongQty"] * p["LongOpenPrice"] + p["SumShortQty"] * p["ShortOpenPrice"]) * market.infos.get(p["Symbol"], DEFAULT_INFO)[1]
+            for p in self.positions.values()
+        ) * 0.1
+        self.margin["ExcessEquity"] = self.margin["TotalEquity"] - margin
+        return position
+
+    def getorderinfo(self, ordid: str) -> list:
+        """查询委托信息，委托确认前返回None"""
+        return self.orders.get(ordid, None)
+
+    def cancelorder(self, report_id: str) -> None:
+        """委托撤单"""
+        self.schedule(self.setting.order_latency, self.cancel, report_id)
+
+    def cancel(self, report_id: str) -> None:
+        """撤销委托并推送委托回报"""
+        with self.lock:
+            report: dict = self.reports.get(report_id, None)
+            if not report or report["ExecType"] in FINISHED_EXECTYPES:
+                return
+            report["ExecType"] = 8
+            report["TransactDate"], report["TransactTime"] = get_transact_time()
+        self.push("onordereportreal", dict(report))
+
+    def getaccountlist(self) -> List[dict]:
+        """查询账户列表"""
+        return [dict(self.account)]
+
+    def getposition(self, accmask: str) -> List[dict]:
+        """查询持仓"""
+        with self.lock:
+            return [dict(position) for position in self.positions.values()]
+
+    def getaccmargin(self, accmask: str) -> List[dict]:
+        """查询资金，同时推送资金回报"""
+        self.schedule(0, self.push, "onmargin", accmask, [dict(self.margin)])
+        return [dict(self.margin)]
+
+    def submargin(self) -> None:
+        """订阅资金推送"""
+        pass
+
+    def subposition(self) -> None:
+        """订阅持仓推送"""
+        pass
+
+    def getorderreport(self) -> List[dict]:
+        """查询当日委托"""
+        with self.lock:
+            return [dict(report) for report in self.reports.values()]
+
+    def getfilledreport(self) -> List[dict]:
+        """查询当日成交"""
+        with self.lock:
+            return [dict(fill) for fill in self.fills]
+
+    def getquotehistory(self, interval: int, count: int, symbol: str, start: str, end: str) -> list:
+        """
+        查询历史数据，时间格式为YYYYMMDDHH
+
+        interval为2时返回Tick，4时返回分钟K线，5时返回日K线，只生成交易日交易时段内的数据。
+        """
+        sleep(self.setting.history_latency)
+        self.statistics["history_requests"] += 1
+
+        info: tuple = market.infos.get(symbol, DEFAULT_INFO)
+        pricetick: float = info[2]
+        price: float = info[4]
+
+        start_dt: datetime = datetime.strptime(start, "%Y%m%d%H")
+        end_dt: datetime = datetime.strptime(end, "%Y%m%d%H")
+        if interval == 2:
+            step: timedelta = timedelta(milliseconds=self.setting.tick_interval)
+        elif interval == 4:
+            step: timedelta = timedelta(minutes=1)
+        else:
+            step: timedelta = timedelta(days=1)
+
+        rows: list = []
+        for dt in get_history_times(start_dt, end_dt, step, interval >= 5):
+            n: int = len(rows)
+            last: float = price + pricetick * (n % 20 - 10)
+            if interval == 2:
+                rows.append({
+                    "DateTime": dt,
+                    "Last": last,
+                    "Quantity": n % 7 + 1,
+                    "OpenInterest": 200000 + n % 100,
+                    "Bid": last - pricetick,
+                    "Ask": last + pricetick,
+                    "BidVolume": 10 + n % 5,
+                    "AskVolume": 12 + n % 5,
+                })
+            else:
+                rows.append({
+                    "DateTime": dt,
+                    "Open": last,
+                    "High": last + pricetick * 5,
+                    "Low": last - pricetick * 5,
+                    "Close": last + pricetick,
+                    "Volume": 100 + n % 50,
+                    "OpenInterest": 200000 + n % 100,
+                })
+
+        self.statistics["history_rows"] += len(rows)
+        return rows
+
+    def get_statistics(self) -> Dict[str, int]:
+        """查询模拟接口的调用统计"""
+        return dict(self.statistics)
+
+
+def get_month(n: int) -> str:
+    """获取从2024年1月起第n个月的年月（YYYYMM）"""
+    return f"{2024 + n // 12}{n % 12 + 1:02d}"
+
+
+def get_transact_time() -> Tuple[str, str]:
+    """获取回报时间（UTC）的日期和时间部分"""
+    now: datetime = datetime.now(timezone.utc)
+    return now.strftime("%Y%m%d"), now.strftime("%H%M%S")
+
+
+def get_history_times(start: datetime, end: datetime, step: timedelta, daily: bool) -> List[datetime]:
+    """生成[start, end)内交易日交易时段的数据时间"""
+    times: List[datetime] = []
+    day: datetime = start.replace(hour=0)
+    while day < end:
+        if day.weekday() < 5:
+            if daily:
+                if day >= start:
+                    times.append(day)
+            else:
+                for session_start, session_end in TRADING_SESSIONS:
+                    dt: datetime = max(day + session_start, start)
+                    session_end = min(day + session_end, end)
+                    while dt < session_end:
+                        times.append(dt)
+                        dt += step
+        day += timedelta(days=1)
+    return times
+
+
+setting: SimulatorSetting = SimulatorSetting()
+market: SimulatedMarket = SimulatedMarket(setting)
+
+
+def install_simulator(new_setting: SimulatorSetting = None) -> None:
+    """以模拟接口替换icetcore模块，重复调用时更新模拟参数并重新生成合约全集"""
+    global setting, market
+
+    if new_setting:
+        setting = new_setting
+        market = SimulatedMarket(setting)
+    sys.modules["icetcore"] = sys.modules[__name__]